@@ -0,0 +1,265 @@
+# benchmark.py
+#
+# offline benchmark of the bootstrapping pipeline on synthetic prices, no network.
+# every stage from get_price_ratio to draw is timed (best of repeat) and then run once
+# more under tracemalloc for its peak memory. results go to a json report.
+# the synthetic inputs and any charts live in a temporary directory that is removed afterwards
+
+import io
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from loadCSV import clear_cache, set_data_dir
+from loadCSV import get_data_dir as _getDataDir
+from loadCSV import DATE_DTYPE
+from saveCSV import save_to_file as _save
+from priceData import HOURLY_COLUMNS, save_hourly, select_daily_closing, daily_closing_file
+from getPriceRatio import get_price_ratio
+from getPriceChange import get_price_change
+from sortPriceChange import sort_price_change
+from drawGraphOnHistoricPrice import draw_graph
+from generateReplicates import generate_replicates
+from getUpperLower import get_tail_summary
+from sortSummary import sort_upper_lower
+from drawGraphOnReplicates import draw
+from getHorizonBounds import get_horizon_bounds
+from renderGraphs import use_headless
+
+
+# synthetic symbols, so real *_daily_closing_*.csv files are never mixed up with them
+SYNTHETIC_ASSETS = (('synth1', 60000.0), ('synth2', 2500.0))
+
+FREQUENCIES = {'daily': 86400, 'hourly': 3600}
+
+# timed stages, in pipeline order
+STAGES = ('get_price_ratio', 'get_price_change', 'sort_price_change', 'draw_graph', 'generate_replicates', 'get_tail_summary', 'sort_upper_lower', 'draw', 'get_horizon_bounds')
+
+# the replicate charts take minutes above this many replicates (~280 s at 100k),
+# so draw is left out of larger runs unless the limit is raised
+DRAW_MAX_REPLICATES = 10_000
+
+
+def synthetic_returns(n: int, n_assets: int, step_vol: float, rng: np.random.Generator, correlation: float = 0.8, tail_df: float = 4.0) -> np.ndarray:
+    # (n x n_assets) log returns with fat tails (student t), volatility clustering (garch(1,1))
+    # and a common market factor, so the pair ratio behaves roughly like two large caps
+    scale = np.sqrt((tail_df - 2) / tail_df)
+    market = rng.standard_t(tail_df, size=(n, 1)) * scale
+    own = rng.standard_t(tail_df, size=(n, n_assets)) * scale
+    shocks = correlation * market + np.sqrt(1 - correlation ** 2) * own
+
+    omega, alpha, beta = 0.05, 0.10, 0.85
+    var = np.ones(n_assets)
+    vol = np.empty((n, n_assets))
+    for t in range(n):
+        vol[t] = np.sqrt(var)
+        var = omega + alpha * var * shocks[t] ** 2 + beta * var
+
+    return shocks * vol * step_vol
+
+
+def synthetic_closing(years: int = 1, freq: str = 'daily', seed: int = 0, daily_vol: float = 0.03, save: bool = True) -> dict[str, pd.DataFrame]:
+    # writes {symbol}_daily_closing_13utc.csv for the synthetic assets, ending today (utc).
+    # hourly mode writes the hourly stores and derives the daily files from them like priceData does
+    if freq not in FREQUENCIES:
+        raise ValueError(f'unknown frequency: {freq} (expected one of {tuple(FREQUENCIES)})')
+
+    step = FREQUENCIES[freq]
+    now_ts = int(datetime.now(timezone.utc).timestamp()) // step * step
+    n = (years * 365 + 30) * 86400 // step + 1
+    times = now_ts - step * np.arange(n - 1, -1, -1, dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    log_returns = synthetic_returns(n, len(SYNTHETIC_ASSETS), daily_vol * np.sqrt(step / 86400), rng)
+
+    frames = {}
+    for col, (symbol, start_price) in enumerate(SYNTHETIC_ASSETS):
+        prices = start_price * np.exp(np.cumsum(log_returns[:, col]))
+
+        if freq == 'hourly':
+            hourly = pd.DataFrame({
+                'time': times,
+                'open': np.concatenate([[start_price], prices[:-1]]),
+                'close': prices
+            })
+            hourly['high'] = hourly[['open', 'close']].max(axis=1)
+            hourly['low'] = hourly[['open', 'close']].min(axis=1)
+            hourly['volumefrom'] = rng.lognormal(8, 1, n)
+            hourly['volumeto'] = hourly['volumefrom'] * hourly['close']
+            hourly = hourly[HOURLY_COLUMNS]
+
+            daily = select_daily_closing(hourly, symbol)
+            if save:
+                save_hourly(symbol, hourly)
+        else:
+            daily = pd.DataFrame({'date': pd.to_datetime(times, unit='s').astype(DATE_DTYPE), f'{symbol}_closing_price_usd': prices})
+
+        if save:
+            _save(daily, daily_closing_file(symbol))
+
+        frames[symbol] = daily
+
+    return frames
+
+
+def measure(stage, *args, repeat: int = 1, memory: bool = True, skip: tuple[str, ...] = (), **kwargs) -> tuple[object, dict]:
+    # best wall time over repeat runs, then one traced run for the peak python/numpy allocation.
+    # stage output is swallowed, the parsed csv cache is cleared before every run.
+    # a skipped stage still runs once untimed when a later stage needs its result
+    if stage.__name__ in skip:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = None if stage.__name__ in ('draw_graph', 'draw') else stage(*args, **kwargs)
+        return result, None
+
+    times = []
+    for _ in range(repeat):
+        clear_cache()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = stage(*args, **kwargs)
+            times.append(time.perf_counter() - start)
+
+    row = {'stage': stage.__name__, 'seconds': min(times), 'peak_mb': None}
+
+    if memory:
+        clear_cache()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                stage(*args, **kwargs)
+            row['peak_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+
+    print(f"  {row['stage']:<20} {row['seconds']:>10.4f}s" + ('' if row['peak_mb'] is None else f"  {row['peak_mb']:>10.1f} MB peak"))
+
+    return result, row
+
+
+def run_pipeline(replicates: list[int], repeat: int = 1, memory: bool = True, seed: int = 0, method: str = 'circular', skip: tuple[str, ...] = (), draw_limit: int = DRAW_MAX_REPLICATES) -> list[dict]:
+    # same hand-off as get_stats, minus the download. the price stages run once,
+    # the replicate stages once per replicate count
+    asset1, asset2 = (symbol for symbol, _ in SYNTHETIC_ASSETS)
+    rows = []
+
+    df_price, row = measure(get_price_ratio, asset1, asset2, save=False, repeat=repeat, memory=memory, skip=skip)
+    rows.append(row)
+    df_change, row = measure(get_price_change, asset1, asset2, df_price, save=False, repeat=repeat, memory=memory, skip=skip)
+    rows.append(row)
+    df_change_ordered, row = measure(sort_price_change, asset1, asset2, df_change, save=False, repeat=repeat, memory=memory, skip=skip)
+    rows.append(row)
+    _, row = measure(draw_graph, asset1, asset2, df_change_ordered, headless=True, repeat=repeat, memory=memory, skip=skip)
+    rows.append(row)
+
+    rows = [row for row in rows if row is not None]
+    for row in rows:
+        row['replicates'] = None
+
+    for n_replicates in replicates:
+        print(f' {n_replicates:,} replicates' + (' (draw skipped, above the draw limit)' if n_replicates > draw_limit and 'draw' not in skip else ''))
+
+        stage_rows = []
+        store, row = measure(generate_replicates, asset1, asset2, n_replicates, df_change, save=False, seed=seed, method=method, repeat=repeat, memory=memory, skip=skip)
+        stage_rows.append(row)
+        (per_replicate, summary), row = measure(get_tail_summary, asset1, asset2, store, save=False, repeat=repeat, memory=memory, skip=skip)
+        stage_rows.append(row)
+
+        bounds = per_replicate[['replicate_index', 'lower_5th_pct', 'upper_95th_pct']]
+        (df_lower, df_upper), row = measure(sort_upper_lower, asset1, asset2, bounds, save=False, repeat=repeat, memory=memory, skip=skip)
+        stage_rows.append(row)
+        draw_skip = skip + ('draw',) if n_replicates > draw_limit else skip
+        _, row = measure(draw, asset1, asset2, df_lower, df_upper, summary, headless=True, repeat=repeat, memory=memory, skip=draw_skip)
+        stage_rows.append(row)
+        _, row = measure(get_horizon_bounds, asset1, asset2, store, save=False, repeat=repeat, memory=memory, skip=skip)
+        stage_rows.append(row)
+
+        stage_rows = [row for row in stage_rows if row is not None]
+        for row in stage_rows:
+            row['replicates'] = n_replicates
+        rows.extend(stage_rows)
+
+    return rows
+
+
+def run_benchmark(years: list[int] = (1,), freq: str = 'daily', replicates: list[int] = (100, 10_000, 100_000), repeat: int = 1, memory: bool = True, seed: int = 0, method: str = 'circular', skip: tuple[str, ...] = (), fileName: str = 'benchmark_report.json', draw_limit: int = DRAW_MAX_REPLICATES) -> dict:
+    unknown = [stage for stage in skip if stage not in STAGES]
+
+    if unknown:
+        raise ValueError(f'unknown stage(s) to skip: {unknown} (expected any of {STAGES})')
+
+    print('')
+    print(f' --- benchmarking pipeline: {list(years)} year(s) {freq}, {list(replicates)} replicates --- ')
+
+    # figures only ever go to file
+    use_headless()
+
+    # the report stays next to the scripts, everything else goes to a temporary directory
+    filePath = os.path.abspath(os.path.join(_getDataDir(), fileName))
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix='benchmark_') as tmpDir:
+        set_data_dir(tmpDir)
+        try:
+            for n_years in years:
+                print('')
+                print(f' {n_years} year(s) of {freq} synthetic prices')
+
+                with contextlib.redirect_stdout(io.StringIO()):
+                    frames = synthetic_closing(n_years, freq, seed)
+
+                rows = run_pipeline(replicates, repeat, memory, seed, method, tuple(skip), draw_limit)
+                for row in rows:
+                    row.update({'years': n_years, 'freq': freq, 'days': len(frames[SYNTHETIC_ASSETS[0][0]])})
+                results.extend(rows)
+        finally:
+            set_data_dir(None)
+            clear_cache()
+
+    report = {
+        'created_utc': datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'config': {'years': list(years), 'freq': freq, 'replicates': list(replicates), 'repeat': repeat, 'memory': memory, 'seed': seed, 'method': method, 'skip': list(skip), 'draw_limit': draw_limit},
+        'results': results
+    }
+
+    with open(filePath, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print('')
+    print(f'benchmark report saved to: {filePath}')
+
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='benchmark the bootstrapping pipeline on synthetic prices')
+    parser.add_argument('--years', type=int, nargs='+', default=[1], help='history length(s) in years, 1 to 20')
+    parser.add_argument('--freq', choices=tuple(FREQUENCIES), default='daily', help='synthetic source frequency')
+    parser.add_argument('--replicates', type=int, nargs='+', default=[100, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=1, help='timed runs per stage, the best is reported')
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc pass')
+    parser.add_argument('--method', default='circular')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--skip', nargs='+', default=[], choices=STAGES, help='stages left out of the report, e.g. draw on large sweeps')
+    parser.add_argument('--draw-limit', type=int, default=DRAW_MAX_REPLICATES, help='largest replicate count the replicate charts are drawn for')
+    parser.add_argument('--out', default='benchmark_report.json')
+    args = parser.parse_args()
+
+    if any(n < 1 or n > 20 for n in args.years):
+        sys.exit('years must be between 1 and 20')
+
+    run_benchmark(args.years, args.freq, args.replicates, args.repeat, not args.no_memory, args.seed, args.method, args.skip, args.out, args.draw_limit)
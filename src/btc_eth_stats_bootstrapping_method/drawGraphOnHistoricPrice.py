@@ -1,32 +1,28 @@
 # drawGraphOnHistoricPrice.py
 
 import os
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import datetime
 from loadCSV import load_from_file as _load
 from loadCSV import get_data_dir as _getDataDir
+from renderGraphs import show_figure, release_figures
 
 
-def draw_graph(asset1: str, asset2: str) -> None:
+def draw_graph(asset1: str, asset2: str, df: pd.DataFrame = None, headless: bool = False) -> None:
     print('')
     print(' --- drawing graph on historic price --- ')
 
-    df = _load(f'{asset1}_{asset2}_price_change_ordered.csv', ['date', 'ratio', 'change_pct'])
+    if df is None:
+        df = _load(f'{asset1}_{asset2}_price_change_ordered.csv', ['date', 'ratio', 'change_pct'])
 
-    # create bar graph
-    plt.figure(figsize=(14, 7))
-    bars = plt.bar(range(len(df)), df['change_pct'], color='skyblue', edgecolor='navy', linewidth=0.5)
-    
-    # highlight negative and positive bars
-    for bar in bars:
-        if bar.get_height() < 0:
-            bar.set_color('salmon')
-    
-    plt.title(f'{asset1} vs {asset2} - daily price change %', fontsize=16)
-    plt.ylabel('price change %', fontsize=12)
-    plt.axhline(0, color='black', linewidth=1)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
+    # create bar graph, negative bars highlighted through one color array
+    fig = plt.figure(figsize=(14, 7))
+    negative = df['change_pct'].to_numpy() < 0
+    colors = np.where(negative, 'salmon', 'skyblue')
+    edgecolors = np.where(negative, 'salmon', 'navy')
+    plt.bar(range(len(df)), df['change_pct'], color=colors, edgecolor=edgecolors, linewidth=0.5)
 
     # get current date and time
     current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
@@ -56,12 +52,13 @@ def draw_graph(asset1: str, asset2: str) -> None:
     plt.tight_layout()
 
     graphPath = os.path.join(_getDataDir(), f'{asset1}_{asset2}_change_pct_bargraph.png')
-    plt.savefig(graphPath)
+    fig.savefig(graphPath)
     print('')
     print(f"graph saved to: {os.path.abspath(graphPath)}")
-    
-    plt.show(block=False)
+
+    show_figure(fig, headless)
 
 
 if __name__ == '__main__':
     draw_graph('btc', 'eth')
+    release_figures()
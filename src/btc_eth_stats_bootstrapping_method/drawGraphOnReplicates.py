@@ -6,6 +6,7 @@ import matplotlib.pyplot as plt
 from enum import Enum
 from loadCSV import load_from_file as _load
 from loadCSV import get_data_dir as _getDataDir
+from renderGraphs import show_figure, release_figures
 
 
 class GraphType(Enum):
@@ -13,23 +14,25 @@ class GraphType(Enum):
     UPPER = 'upper'
     
 
-def draw(asset1: str, asset2: str) -> None:
+def draw(asset1: str, asset2: str, df_lower: pd.DataFrame = None, df_upper: pd.DataFrame = None, summary: pd.DataFrame = None, headless: bool = False) -> None:
     print('')
     print(' --- drawing graphs on replicates --- ')
 
-    df_lower = _load(f'{asset1}_{asset2}_lower_ordered.csv', ['replicate_index', 'lower_5th_pct'])
-    df_upper = _load(f'{asset1}_{asset2}_upper_ordered.csv', ['replicate_index', 'upper_95th_pct'])
+    if df_lower is None:
+        df_lower = _load(f'{asset1}_{asset2}_lower_ordered.csv', ['replicate_index', 'lower_5th_pct'])
+    if df_upper is None:
+        df_upper = _load(f'{asset1}_{asset2}_upper_ordered.csv', ['replicate_index', 'upper_95th_pct'])
 
-    proc_graph(df_lower, 'lower', asset1, asset2)
-    proc_graph(df_upper, 'upper', asset1, asset2)
+    proc_graph(df_lower, 'lower', asset1, asset2, summary, headless)
+    proc_graph(df_upper, 'upper', asset1, asset2, summary, headless)
 
 
-def proc_graph(df: pd.DataFrame, graphType: GraphType, asset1: str, asset2: str) -> None:
+def proc_graph(df: pd.DataFrame, graphType: GraphType, asset1: str, asset2: str, summary: pd.DataFrame = None, headless: bool = False) -> None:
     # use a simple sequential x-axis (0, 1, 2, ...) since we're not using replicate_index
     x = range(len(df))
 
     # create the plot
-    plt.figure(figsize=(12, 6))
+    fig = plt.figure(figsize=(12, 6))
 
     col = ''
 
@@ -40,15 +43,21 @@ def proc_graph(df: pd.DataFrame, graphType: GraphType, asset1: str, asset2: str)
 
     plt.bar(x, df[col], color='skyblue', edgecolor='navy', alpha=0.8)
     
+    # median and 2.5th / 97.5th percentile across replicates, from the tail summary when given
+    if summary is not None and col in summary.index:
+        median_value = summary.loc[col, 'median']
+        p025 = summary.loc[col, 'ci_2.5th']
+        p975 = summary.loc[col, 'ci_97.5th']
+    else:
+        median_value = df[col].median()
+        p025 = df[col].quantile(0.025)
+        p975 = df[col].quantile(0.975)
+
     # horizontal line for the median
-    median_value = df[col].median()
-    
     plt.axhline(y=median_value, color='red', linestyle='--', linewidth=2,
                 label=f'median = {median_value:.6f}')
     
     # add lines for 2.5th percentile and 97.5th percentile
-    p025 = df[col].quantile(0.025)
-    p975 = df[col].quantile(0.975)
     plt.axhline(y=p025, color='orange', linestyle=':', linewidth=2,
                 label=f'2.5th pct = {p025:.6f}')
     plt.axhline(y=p975, color='orange', linestyle=':', linewidth=2,
@@ -76,12 +85,14 @@ def proc_graph(df: pd.DataFrame, graphType: GraphType, asset1: str, asset2: str)
     
     plt.legend()
     plt.tight_layout()
-    plt.show(block=False)
 
-    plt.savefig(graphPath)
+    fig.savefig(graphPath)
     print('')
     print(f"graph saved to: {os.path.abspath(graphPath)}")
 
+    show_figure(fig, headless)
+
 
 if __name__ == '__main__':
     draw('btc', 'eth')
+    release_figures()
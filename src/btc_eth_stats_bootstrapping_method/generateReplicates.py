@@ -1,83 +1,165 @@
 import pandas as pd
 import math
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
 from loadCSV import load_from_file as _load
-from saveCSV import save_to_file as _save
-
-
-def generate_block(repIndex: int, blockIndex: int, df: pd.DataFrame, block_size: int) -> pd.DataFrame:
-    # generate a random wrapped block of rows from the DataFrame.
-    totalRows = len(df)
-    rng = np.random.default_rng()
-    randInt = rng.integers(0, totalRows)  # random starting row
-    
-    # wrapped indices
-    indices = [(randInt + i) % totalRows for i in range(block_size)]
-    
-    # select rows: date, ratio, change_pct
-    selected = df.iloc[indices, [0, 1, 2]].copy().reset_index(drop=True)
-    selected.columns = ['date', 'ratio', 'change_pct']
-    
-    # add replicate and block info
-    selected.insert(0, 'replicate_index', repIndex)
-    selected.insert(1, 'block_index', blockIndex)
-    
-    return selected
-
-
-def generate_replicates(asset1: str, asset2: str, n_replicates: int = 10) -> None:
+from replicateStore import ReplicateStore
+from resampling import check_method, resolve_block_size, draw_starts, stationary_indices, run_until_converged
+from getUpperLower import replicate_quantiles
+
+
+# replicates drawn from each child stream of the seed sequence.
+# fixed so the output for a seed does not depend on the number of workers
+CHUNK_REPLICATES = 4096
+
+
+def get_block_params(total_rows: int, block_size: float) -> tuple[int, int]:
+    # rows per replicate and the number of block starts stored for each replicate.
+    # replicates cover every source row with whole blocks of the (mean) block size
+    block_count = math.ceil(total_rows / round(block_size))
+    rows_per_replicate = block_count * round(block_size)
+    return rows_per_replicate, block_count
+
+
+def draw_replicate_chunk(total_rows: int, block_size: float, n_replicates: int, cols: int, method: str, rng: np.random.Generator) -> np.ndarray:
+    # block starts for fixed-size blocks, full row indices for stationary blocks
+    if method == 'stationary':
+        return stationary_indices(total_rows, block_size, n_replicates, cols, rng)
+
+    return draw_starts(total_rows, block_size, n_replicates, cols, method, rng)
+
+
+def _fill_chunks(shmName: str, shape: tuple[int, int], total_rows: int, block_size: float, method: str, chunks: list[tuple[int, int, np.random.SeedSequence]]) -> None:
+    # worker: draw the given replicate ranges straight into the shared start matrix
+    shm = shared_memory.SharedMemory(name=shmName)
+
+    try:
+        starts = np.ndarray(shape, dtype=np.int32, buffer=shm.buf)
+
+        for first, last, childSeq in chunks:
+            rng = np.random.default_rng(childSeq)
+            starts[first:last] = draw_replicate_chunk(total_rows, block_size, last - first, shape[1], method, rng)
+    finally:
+        shm.close()
+
+
+def draw_block_starts_seeded(total_rows: int, block_size: float, n_replicates: int, cols: int, seedSeq: np.random.SeedSequence, method: str = 'circular', workers: int = 1) -> np.ndarray:
+    # one independent child stream per chunk of replicates, chunks sharded across a process pool
+    n_chunks = math.ceil(n_replicates / CHUNK_REPLICATES)
+    chunks = [
+        (i * CHUNK_REPLICATES, min((i + 1) * CHUNK_REPLICATES, n_replicates), childSeq)
+        for i, childSeq in enumerate(seedSeq.spawn(n_chunks))
+    ]
+
+    shape = (n_replicates, cols)
+
+    if workers <= 1 or n_chunks <= 1:
+        starts = np.empty(shape, dtype=np.int32)
+        for first, last, childSeq in chunks:
+            rng = np.random.default_rng(childSeq)
+            starts[first:last] = draw_replicate_chunk(total_rows, block_size, last - first, cols, method, rng)
+        return starts
+
+    workers = min(workers, n_chunks)
+    shards = [chunks[i::workers] for i in range(workers)]
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, n_replicates * cols * np.dtype(np.int32).itemsize))
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_fill_chunks, shm.name, shape, total_rows, block_size, method, shard) for shard in shards]
+            for future in futures:
+                future.result()
+
+        starts = np.ndarray(shape, dtype=np.int32, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return starts
+
+
+def generate_replicates(asset1: str, asset2: str, n_replicates: int = 10, df: pd.DataFrame = None, save: bool = True, seed: int = None, workers: int = 1, method: str = 'circular', block_size=None) -> ReplicateStore:
     print("")
     print(" --- generating replicates ---")
-    
-    df = _load(f'{asset1}_{asset2}_price_change.csv', ['date', 'ratio', 'change_pct'])
 
-    # Output setup
-    price_col_name = f'{asset1}_{asset2}_price'
-    #fieldnames = ['replicate_index', 'block_index', 'date', price_col_name, 'change_pct']
+    method = check_method(method)
+    sourceFile = f'{asset1}_{asset2}_price_change.csv'
 
-    # block parameters
+    if df is None:
+        df = _load(sourceFile, ['date', 'ratio', 'change_pct'])
+
+    # block parameters, None -> sqrt heuristic, 'auto' -> Politis & White estimate
     total_rows = len(df)
-    block_size = round(math.sqrt(total_rows)) #sqrt heuristic
-    block_count = math.ceil(total_rows / block_size)
+    block_size = resolve_block_size(df['change_pct'].to_numpy(), block_size, method)
+    rows_per_replicate, block_count = get_block_params(total_rows, block_size)
 
     print(f"total rows: {total_rows}")
-    print(f"block size: {block_size}")
+    print(f"bootstrap method: {method}")
+    print(f"block size: {block_size:g}{' (mean)' if method == 'stationary' else ''}")
     print(f"number of blocks per replicate: {block_count}")
     print(f"total replicates: {n_replicates}")
 
-    all_replicates = []
-
-    for rep_index in range(n_replicates):
-        #print(f"generating replicate {rep_index + 1}/{n_replicates}")
-        replicate_blocks = []
-
-        for block_index in range(block_count):
-            block_df = generate_block(
-                repIndex=rep_index,
-                blockIndex=block_index,
-                df=df,
-                block_size=block_size
-            )
-            # add the price column (same as ratio)
-            block_df[price_col_name] = block_df['ratio']
-            # final column order
-            final_block = block_df[['replicate_index', 'block_index', 'date', price_col_name, 'change_pct']]
-            replicate_blocks.append(final_block)
-
-            #first_date = block_df['date'].iloc[0]
-            #print(f"block {block_index + 1}/{block_count} starting at {first_date}")
-
-        # combine blocks for this replicate
-        replicate_df = pd.concat(replicate_blocks, ignore_index=True)
-        all_replicates.append(replicate_df)
-
-    # combine all replicates and save
-    full_df = pd.concat(all_replicates, ignore_index=True)
-
-    print(f"total rows in file: {len(full_df)}")
-    print(f"rows per replicate: {len(full_df) // n_replicates}")
-    
-    _save(full_df, f'{asset1}_{asset2}_replicates.csv')
+    # log the entropy so an unseeded run can be reproduced later
+    seedSeq = np.random.SeedSequence(seed)
+    print(f"seed: {seedSeq.entropy}")
+    print(f"workers: {workers}")
+
+    # only the block starts are kept, rows are gathered from the source on demand
+    cols = rows_per_replicate if method == 'stationary' else block_count
+    starts = draw_block_starts_seeded(total_rows, block_size, n_replicates, cols, seedSeq, method, workers)
+    store = ReplicateStore(starts, block_size, sourceFile, df, seed=seedSeq.entropy, method=method)
+
+    print(f"rows per replicate: {store.rows_per_replicate}")
+
+    if save:
+        store.save(f'{asset1}_{asset2}_replicates.npz')
+
+    return store
+
+
+def generate_replicates_adaptive(asset1: str, asset2: str, tol: float = 0.01, batch_size: int = 100, max_replicates: int = 100_000, percentiles: list[float] = (5, 95), df: pd.DataFrame = None, save: bool = True, seed: int = None, workers: int = 1, method: str = 'circular', block_size=None) -> tuple[ReplicateStore, dict]:
+    # keep adding batches of replicates until the monte carlo error of the tracked
+    # percentiles (their mean and 2.5/97.5 endpoints across replicates, in change_pct units) is below tol
+    print("")
+    print(" --- generating replicates (adaptive) ---")
+
+    method = check_method(method)
+    sourceFile = f'{asset1}_{asset2}_price_change.csv'
+
+    if df is None:
+        df = _load(sourceFile, ['date', 'ratio', 'change_pct'])
+
+    total_rows = len(df)
+    block_size = resolve_block_size(df['change_pct'].to_numpy(), block_size, method)
+    rows_per_replicate, block_count = get_block_params(total_rows, block_size)
+    cols = rows_per_replicate if method == 'stationary' else block_count
+
+    print(f"total rows: {total_rows}")
+    print(f"bootstrap method: {method}")
+    print(f"block size: {block_size:g}{' (mean)' if method == 'stationary' else ''}")
+    print(f"tolerance: {tol} | batch size: {batch_size} | max replicates: {max_replicates}")
+
+    seedSeq = np.random.SeedSequence(seed)
+    print(f"seed: {seedSeq.entropy}")
+
+    batches = []
+
+    def draw_batch(n: int) -> np.ndarray:
+        starts = draw_block_starts_seeded(total_rows, block_size, n, cols, seedSeq, method, workers)
+        batches.append(starts)
+        batch = ReplicateStore(starts, block_size, sourceFile, df, method=method)
+        return replicate_quantiles(batch.values('change_pct'), percentiles)
+
+    _, info = run_until_converged(draw_batch, tol, batch_size, max_replicates)
+
+    store = ReplicateStore(np.concatenate(batches), block_size, sourceFile, df, seed=seedSeq.entropy, method=method)
+
+    if save:
+        store.save(f'{asset1}_{asset2}_replicates.npz')
+
+    return store, info
 
 
 if __name__ == '__main__':
@@ -0,0 +1,85 @@
+# getBatchStats.py
+
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from priceData import download_assets
+from getPriceRatio import get_price_panel
+from getPriceChange import get_price_change
+from generateReplicates import generate_replicates
+from sortPriceChange import sort_price_change
+from sortSummary import sort_upper_lower
+from drawGraphOnHistoricPrice import draw_graph
+from drawGraphOnReplicates import draw
+from getUpperLower import get_upper_lower, percentile_col
+from renderGraphs import use_headless
+from saveCSV import save_to_file as _save
+
+
+def summarize_bounds(asset1: str, asset2: str, summary: pd.DataFrame, days: int) -> dict:
+    # median and 95% interval across replicates for every bound column
+    row = {'pair': f'{asset1}_{asset2}', 'asset1': asset1, 'asset2': asset2, 'days': days, 'replicates': len(summary)}
+
+    for col in summary.columns.drop('replicate_index'):
+        values = summary[col]
+        row[f'{col}_median'] = values.median()
+        row[f'{col}_2.5th'] = values.quantile(0.025)
+        row[f'{col}_97.5th'] = values.quantile(0.975)
+
+    return row
+
+
+def run_pair(asset1: str, asset2: str, df_price: pd.DataFrame, n_replicates: int, seed: int, method: str, block_size, percentiles: list[float], graphs: bool = False) -> dict:
+    # per-pair bootstrap work, runs in a worker process
+    df_change = get_price_change(asset1, asset2, df_price, save=False)
+    store = generate_replicates(asset1, asset2, n_replicates, df_change, save=False, seed=seed, method=method, block_size=block_size)
+    summary = get_upper_lower(asset1, asset2, store, percentiles, save=False)
+
+    if graphs:
+        # headless in the worker, every figure is closed once its file is written
+        draw_graph(asset1, asset2, sort_price_change(asset1, asset2, df_change, save=False), headless=True)
+        df_lower, df_upper = sort_upper_lower(asset1, asset2, summary, save=False)
+        draw(asset1, asset2, df_lower, df_upper, headless=True)
+
+    return summarize_bounds(asset1, asset2, summary, len(df_change))
+
+
+def get_batch_stats(pairs: list[tuple[str, str]], n_replicates: int = 100, years: int = 1, workers: int = None, seed: int = None, method: str = 'circular', block_size=None, percentiles: list[float] = (5, 95), graphs: bool = False) -> pd.DataFrame:
+    print('')
+    print(f' --- batch stats on {len(pairs)} pair(s) --- ')
+
+    pairs = [(asset1.lower(), asset2.lower()) for asset1, asset2 in pairs]
+
+    # every distinct asset is downloaded and joined once, each pair is sliced from the panel
+    assets = list(dict.fromkeys(asset for pair in pairs for asset in pair))
+    closing = download_assets(assets, years=years)
+
+    panel = get_price_panel(assets, closing, save=False)
+    prices = {(asset1, asset2): panel.pair(asset1, asset2) for asset1, asset2 in pairs}
+
+    # one child seed per pair, so the batch is reproducible from a single seed
+    seedSeq = np.random.SeedSequence(seed)
+    pairSeeds = [int(child.generate_state(1, np.uint64)[0]) for child in seedSeq.spawn(len(pairs))]
+    print(f'batch seed: {seedSeq.entropy}')
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_headless) as pool:
+        futures = [
+            pool.submit(run_pair, asset1, asset2, prices[(asset1, asset2)], n_replicates, pairSeed, method, block_size, list(percentiles), graphs)
+            for (asset1, asset2), pairSeed in zip(pairs, pairSeeds)
+        ]
+        rows = [future.result() for future in futures]
+
+    result = pd.DataFrame(rows)
+
+    print('')
+    print('summary of change_pct bounds per pair:')
+    print(result[['pair', 'days'] + [f'{percentile_col(p)}_median' for p in percentiles]])
+    print('')
+
+    _save(result, 'batch_upper_lower_summary.csv')
+
+    return result
+
+
+if __name__ == '__main__':
+    get_batch_stats([('btc', 'eth'), ('btc', 'sol'), ('eth', 'sol')])
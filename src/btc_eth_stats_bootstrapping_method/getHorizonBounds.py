@@ -0,0 +1,65 @@
+# getHorizonBounds.py
+
+import numpy as np
+import pandas as pd
+from saveCSV import save_to_file as _save
+from replicateStore import ReplicateStore
+from getUpperLower import replicate_quantiles, percentile_col, summarize_replicates
+
+
+def daily_log_changes(source: pd.DataFrame) -> np.ndarray:
+    # per-row log change of the ratio, from the cumulative log ratio when the change stage wrote it
+    if 'log_ratio_cum' in source.columns:
+        return np.diff(source['log_ratio_cum'].to_numpy(), prepend=0.0)
+
+    return np.log1p(source['change_pct'].to_numpy() / 100)
+
+
+def horizon_changes(cum: np.ndarray, horizon: int) -> np.ndarray:
+    # (replicates x rows + 1) prefix sums -> every overlapping h-day change in %, (replicates x rows - h + 1)
+    if horizon < 1:
+        raise ValueError(f'horizon must be at least 1 day, got {horizon}')
+    if horizon >= cum.shape[1]:
+        raise ValueError(f'horizon of {horizon} days is longer than a replicate ({cum.shape[1] - 1} days)')
+
+    return np.expm1(cum[:, horizon:] - cum[:, :-horizon]) * 100
+
+
+def get_horizon_bounds(asset1: str, asset2: str, store: ReplicateStore = None, horizons: list[int] = (1, 3, 7), percentiles: list[float] = (5, 95), save: bool = True) -> pd.DataFrame:
+    print('')
+    print(f' --- getting {list(horizons)} day bounds of replicates --- ')
+
+    if store is None:
+        store = ReplicateStore.load(f'{asset1}_{asset2}_replicates.npz')
+
+    # one prefix sum per replicate path, every horizon is a difference of two columns
+    steps = daily_log_changes(store.source)[store.indices()]
+    cum = np.zeros((steps.shape[0], steps.shape[1] + 1))
+    np.cumsum(steps, axis=1, out=cum[:, 1:])
+
+    tables = []
+    for horizon in horizons:
+        bounds = replicate_quantiles(horizon_changes(cum, horizon), percentiles)
+
+        per_replicate = pd.DataFrame(bounds, columns=[percentile_col(p) for p in percentiles])
+        per_replicate.insert(0, 'replicate_index', np.arange(store.n_replicates))
+
+        table = summarize_replicates(per_replicate).reset_index()
+        table.insert(0, 'horizon_days', horizon)
+        tables.append(table)
+
+    result = pd.concat(tables, ignore_index=True)
+
+    print('')
+    print('change_pct bounds per horizon (across replicates):')
+    print(result)
+    print('')
+
+    if save:
+        _save(result, f'{asset1}_{asset2}_horizon_bounds.csv')
+
+    return result
+
+
+if __name__ == '__main__':
+    get_horizon_bounds('btc', 'eth')
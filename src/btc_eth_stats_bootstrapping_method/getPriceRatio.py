@@ -1,19 +1,24 @@
 #getPriceRatio.py
 
+import numpy as np
 import pandas as pd
 from loadCSV import load_from_file as _load
 from saveCSV import save_to_file as _save
+from pricePanel import PricePanel
+from priceData import daily_closing_file
 
 
-def get_price_ratio(asset1='btc', asset2='eth'):
+def get_price_ratio(asset1='btc', asset2='eth', df1: pd.DataFrame = None, df2: pd.DataFrame = None, save: bool = True) -> pd.DataFrame:
     asset1 = asset1.lower()
     asset2 = asset2.lower()
     
     print("")
     print(f" --- calculating {asset1}/{asset2} price ratio ---")
 
-    df1 = _load(f'{asset1}_daily_closing.csv', ['date', f'{asset1}_closing_price_usd'])
-    df2 = _load(f'{asset2}_daily_closing.csv', ['date', f'{asset2}_closing_price_usd'])
+    if df1 is None:
+        df1 = _load(daily_closing_file(asset1), ['date', f'{asset1}_closing_price_usd'])
+    if df2 is None:
+        df2 = _load(daily_closing_file(asset2), ['date', f'{asset2}_closing_price_usd'])
    
     print('')
     print(df1)
@@ -48,7 +53,44 @@ def get_price_ratio(asset1='btc', asset2='eth'):
     print('')
     print(result_df)
 
-    _save(result_df, f'{asset1}_{asset2}_price.csv') 
+    if save:
+        _save(result_df, f'{asset1}_{asset2}_price.csv') 
+
+    return result_df
+
+
+def get_price_panel(assets: list[str], frames: dict[str, pd.DataFrame] = None, save: bool = True) -> PricePanel:
+    # join every asset once on date, any pair is then sliced from the panel
+    assets = list(dict.fromkeys(asset.lower() for asset in assets))
+
+    print("")
+    print(f" --- building {'/'.join(assets)} price panel ---")
+
+    if frames is None:
+        frames = {}
+
+    series = []
+    for asset in assets:
+        df = frames.get(asset)
+        if df is None:
+            df = _load(daily_closing_file(asset), ['date', f'{asset}_closing_price_usd'])
+
+        # second column is the price (first is 'date')
+        price = df.set_index('date')[df.columns[1]]
+        series.append(price.rename(asset))
+
+    # outer join, so a pair keeps every date both of its assets have
+    combined = pd.concat(series, axis=1, join='outer').sort_index()
+
+    panel = PricePanel(combined.index.to_numpy(), assets, combined.to_numpy(dtype=np.float64))
+
+    print('')
+    print(f'{len(panel.dates)} dates x {len(assets)} assets, {len(panel.pairs)} pairs')
+
+    if save:
+        panel.save(f"{'_'.join(assets)}_panel.npz")
+
+    return panel
 
 
 if __name__ == '__main__':
@@ -0,0 +1,97 @@
+# getRollingBounds.py
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from loadCSV import load_from_file as _load
+from saveCSV import save_to_file as _save
+from resampling import check_method, resolve_block_size, sqrt_block_size, resample_indices
+from getUpperLower import replicate_quantiles, percentile_col
+
+
+# resampled values gathered per chunk of windows (windows x replicates x window rows)
+CHUNK_ELEMENTS = 8_000_000
+
+
+def window_bounds(windows: np.ndarray, indices: np.ndarray, percentiles: list[float]) -> np.ndarray:
+    # (windows x rows) series windows, (replicates x rows) in-window indices
+    # -> (windows x replicates x percentiles), every window resampled with the same draws
+    n_windows, window = windows.shape
+    n_replicates = indices.shape[0]
+
+    resampled = windows[:, indices].reshape(n_windows * n_replicates, window)
+
+    return replicate_quantiles(resampled, percentiles).reshape(n_windows, n_replicates, -1)
+
+
+def get_rolling_bounds(asset1: str, asset2: str, df: pd.DataFrame = None, window: int = 90, step: int = 1, n_replicates: int = 1000, percentiles: list[float] = (5, 95), method: str = 'circular', block_size=None, seed: int = None, save: bool = True) -> pd.DataFrame:
+    # only the block draws are shared between windows. every window still takes its own quantiles:
+    # a step moves every gathered row of every replicate, so no partial sort carries over
+    # and one partition per (window, replicate) is cheaper than patching sorted state
+    print('')
+    print(f' --- getting rolling {window} day bounds of replicates --- ')
+
+    method = check_method(method)
+    percentiles = list(percentiles)
+
+    if df is None:
+        df = _load(f'{asset1}_{asset2}_price_change.csv', ['date', 'ratio', 'change_pct'])
+
+    values = df['change_pct'].to_numpy(dtype=np.float64)
+    n = len(values)
+
+    if not 1 < window <= n:
+        raise ValueError(f'window of {window} rows does not fit a series of {n} rows')
+
+    # blocks are sized for the window, 'auto' estimates on the full series
+    if block_size is None:
+        block_size = sqrt_block_size(window)
+    else:
+        block_size = min(resolve_block_size(values, block_size, method), window)
+
+    # one set of in-window block draws reused by every window (common random numbers),
+    # so bound changes between windows come from the data and not from fresh draws
+    seedSeq = np.random.SeedSequence(seed)
+    rng = np.random.default_rng(seedSeq)
+    indices = resample_indices(window, n_replicates, block_size, method, rng=rng)
+
+    print(f'window: {window} rows | step: {step} | replicates: {n_replicates} | block size: {block_size:g} ({method})')
+    print(f'seed: {seedSeq.entropy}')
+
+    # (windows x rows) strided view, nothing is copied until a chunk is gathered
+    windows = sliding_window_view(values, window)[::step]
+    ends = np.arange(window - 1, n, step)
+
+    chunk = max(1, CHUNK_ELEMENTS // (n_replicates * window))
+    bands = np.empty((len(windows), 3, len(percentiles)))
+    for first in range(0, len(windows), chunk):
+        bounds = window_bounds(windows[first:first + chunk], indices, percentiles)
+        bands[first:first + chunk] = np.percentile(bounds, [50, 2.5, 97.5], axis=1).transpose(1, 0, 2)
+
+    # the plain window percentiles next to the bootstrap bands
+    sample = replicate_quantiles(np.ascontiguousarray(windows), percentiles)
+
+    result = pd.DataFrame({
+        'date': df['date'].to_numpy()[ends],
+        'window_start': df['date'].to_numpy()[ends - window + 1]
+    })
+    for k, p in enumerate(percentiles):
+        col = percentile_col(p)
+        result[f'{col}_sample'] = sample[:, k]
+        result[f'{col}_median'] = bands[:, 0, k]
+        result[f'{col}_2.5th'] = bands[:, 1, k]
+        result[f'{col}_97.5th'] = bands[:, 2, k]
+
+    print('')
+    print(f'bootstrap bounds for {len(result)} windows:')
+    print(result)
+    print('')
+
+    if save:
+        _save(result, f'{asset1}_{asset2}_rolling_bounds.csv')
+
+    return result
+
+
+if __name__ == '__main__':
+    get_rolling_bounds('btc', 'eth')
@@ -1,41 +1,84 @@
-import time
-from priceData import download_crypto_daily_closing
+from priceData import download_assets
 from getPriceRatio import get_price_ratio 
 from getPriceChange import get_price_change
 from sortPriceChange import sort_price_change
 from drawGraphOnHistoricPrice import draw_graph
-from generateReplicates import generate_replicates
-from sortReplicates import sort_reps
-from getUpperLower import get_upper_lower
+from generateReplicates import generate_replicates, generate_replicates_adaptive
+from getUpperLower import get_tail_summary
+from getHorizonBounds import get_horizon_bounds
+from getRollingBounds import get_rolling_bounds
 from sortSummary import sort_upper_lower
-from drawGraphOnReplicates import draw 
+from drawGraphOnReplicates import draw, proc_graph
+from renderGraphs import render_graphs, release_figures
 
 
-def get_stats(asset1: str, asset2: str) -> None:
+# intermediate artifacts that can be written as checkpoints
+STAGES = (
+    'price',
+    'price_change',
+    'price_change_ordered',
+    'replicates',
+    'upper_lower_summary',
+    'tail_summary',
+    'upper_lower_ordered',
+    'horizon_bounds',
+    'rolling_bounds'
+)
+
+
+def get_stats(asset1: str, asset2: str, checkpoints: tuple[str, ...] = (), method: str = 'circular', block_size=None, tol: float = None, horizons: tuple[int, ...] = (1, 3, 7), headless: bool = False, rolling_window: int = None) -> None:
+    # stages hand their results to each other in memory,
+    # only the stages listed in checkpoints write their csv
+    unknown = [stage for stage in checkpoints if stage not in STAGES]
+
+    if unknown:
+        raise ValueError(f'unknown checkpoint stage(s): {unknown}')
+
     print('')
     print('lets go baby..')
 
-    download_crypto_daily_closing(crypto_symbol=asset1, years=1)
-    time.sleep(1)
-    download_crypto_daily_closing(crypto_symbol=asset2, years=1)
+    closing = download_assets([asset1, asset2], years=1)
 
-    get_price_ratio(asset1, asset2)
+    df_price = get_price_ratio(asset1, asset2, closing[asset1], closing[asset2], save='price' in checkpoints)
 
-    get_price_change(asset1, asset2)
+    df_change = get_price_change(asset1, asset2, df_price, save='price_change' in checkpoints)
     
-    sort_price_change(asset1, asset2)
+    df_change_ordered = sort_price_change(asset1, asset2, df_change, save='price_change_ordered' in checkpoints)
+
+    if not headless:
+        draw_graph(asset1, asset2, df_change_ordered)
+
+    if tol is None:
+        store = generate_replicates(asset1, asset2, 100, df_change, save='replicates' in checkpoints, method=method, block_size=block_size)
+    else:
+        # batches of 100 replicates until the bounds are stable to within tol (change_pct units)
+        store, _ = generate_replicates_adaptive(asset1, asset2, tol, 100, df=df_change, save='replicates' in checkpoints, method=method, block_size=block_size)
 
-    draw_graph(asset1, asset2)
+    # percentile grid, expected shortfall and max moves per replicate in one pass
+    per_replicate, summary = get_tail_summary(asset1, asset2, store, save='tail_summary' in checkpoints, save_replicates='upper_lower_summary' in checkpoints)
 
-    generate_replicates(asset1, asset2, 100)
+    bounds = per_replicate[['replicate_index', 'lower_5th_pct', 'upper_95th_pct']]
+    df_lower, df_upper = sort_upper_lower(asset1, asset2, bounds, save='upper_lower_ordered' in checkpoints)
 
-    sort_reps(asset1, asset2)
+    if headless:
+        # all three graphs at once on the Agg backend, in worker processes
+        render_graphs([
+            (draw_graph, (asset1, asset2, df_change_ordered)),
+            (proc_graph, (df_lower, 'lower', asset1, asset2, summary)),
+            (proc_graph, (df_upper, 'upper', asset1, asset2, summary))
+        ])
+    else:
+        draw(asset1, asset2, df_lower, df_upper, summary)
 
-    get_upper_lower(asset1, asset2)
+    # multi-day ratio changes from the same replicates
+    get_horizon_bounds(asset1, asset2, store, horizons, save='horizon_bounds' in checkpoints)
 
-    sort_upper_lower(asset1, asset2)
+    # how the bounds drift over time, one bootstrap per window end
+    if rolling_window is not None:
+        get_rolling_bounds(asset1, asset2, df_change, rolling_window, method=method, save='rolling_bounds' in checkpoints)
 
-    draw(asset1, asset2)
+    # the charts drawn along the way stay open without holding up the pipeline, they are freed here
+    release_figures(headless)
 
 
 if __name__ == '__main__':
@@ -1,27 +1,94 @@
 # getUpperLower.py
 
+import numpy as np
 import pandas as pd
-from loadCSV import load_from_file as _load
 from saveCSV import save_to_file as _save
+from replicateStore import ReplicateStore
 
 
-def get_upper_lower(asset1: str, asset2: str) -> None:
+def percentile_col(p: float) -> str:
+    # 5 -> lower_5th_pct, 95 -> upper_95th_pct, 50 -> median_pct
+    if p == 50:
+        return 'median_pct'
+
+    suffix = 'th'
+    if float(p).is_integer() and int(p) % 100 not in (11, 12, 13):
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(int(p) % 10, 'th')
+
+    side = 'lower' if p < 50 else 'upper'
+    return f'{side}_{p:g}{suffix}_pct'
+
+
+def replicate_quantiles(values: np.ndarray, percentiles: list[float]) -> np.ndarray:
+    # (replicates x rows) -> (replicates x percentiles) using selection instead of a full sort.
+    # linear interpolation is done the same way pandas groupby.quantile does it,
+    # so results match the old sort + groupby path bit for bit
+    n = values.shape[1]
+
+    pos = np.asarray(percentiles, dtype=np.float64) / 100 * (n - 1)
+    lo = pos.astype(np.int64)
+    hi = np.minimum(lo + 1, n - 1)
+    frac = pos % 1
+
+    part = np.partition(values, np.unique(np.concatenate([lo, hi])), axis=1)
+
+    return interpolate(part, lo, hi, frac)
+
+
+def interpolate(ordered: np.ndarray, lo: np.ndarray, hi: np.ndarray, frac: np.ndarray) -> np.ndarray:
+    lo_vals = ordered[:, lo]
+    hi_vals = ordered[:, hi]
+
+    return lo_vals + (hi_vals - lo_vals) * frac
+
+
+def sorted_quantiles(ordered: np.ndarray, percentiles: list[float]) -> np.ndarray:
+    # same interpolation as replicate_quantiles, on rows that are already sorted
+    n = ordered.shape[1]
+
+    pos = np.asarray(percentiles, dtype=np.float64) / 100 * (n - 1)
+    lo = pos.astype(np.int64)
+    hi = np.minimum(lo + 1, n - 1)
+
+    return interpolate(ordered, lo, hi, pos % 1)
+
+
+def tail_stats(values: np.ndarray, percentiles: list[float], es_levels: tuple[float, float]) -> dict[str, np.ndarray]:
+    # one sort per replicate gives the whole percentile grid and both expected shortfalls.
+    # max adverse moves come from compounding the replicate path in resampled order
+    n = values.shape[1]
+    ordered = np.sort(values, axis=1)
+
+    stats = dict(zip([percentile_col(p) for p in percentiles], sorted_quantiles(ordered, percentiles).T))
+
+    # expected shortfall: mean of the worst (best) changes beyond the level
+    lower_level, upper_level = es_levels
+    k_lower = max(1, int(np.ceil(lower_level / 100 * n)))
+    k_upper = max(1, int(np.ceil((100 - upper_level) / 100 * n)))
+    stats[f'es_{percentile_col(lower_level)}'] = ordered[:, :k_lower].mean(axis=1)
+    stats[f'es_{percentile_col(upper_level)}'] = ordered[:, n - k_upper:].mean(axis=1)
+
+    # ratio path relative to its start, worst drop from a peak and biggest rise from a trough
+    path = np.cumprod(1 + values / 100, axis=1)
+    stats['max_drawdown_pct'] = ((path / np.maximum.accumulate(path, axis=1)).min(axis=1) - 1) * 100
+    stats['max_runup_pct'] = ((path / np.minimum.accumulate(path, axis=1)).max(axis=1) - 1) * 100
+
+    return stats
+
+
+def get_upper_lower(asset1: str, asset2: str, store: ReplicateStore = None, percentiles: list[float] = (5, 95), save: bool = True) -> pd.DataFrame:
     print('')
     print(' --- getting upper lower of replicates --- ')
     
-    df = _load(f'{asset1}_{asset2}_replicates_ordered.csv', ['replicate_index', 'date', f'{asset1}_{asset2}_price', 'change_pct'])
+    if store is None:
+        store = ReplicateStore.load(f'{asset1}_{asset2}_replicates.npz')
+
+    # percentiles of change_pct per replicate, straight from the replicate value matrix
+    bounds = replicate_quantiles(store.values('change_pct'), percentiles)
 
-    # group by replicate_index and calculate 5th and 95th percentiles of change_pct
-    grouped = df.groupby('replicate_index')['change_pct']
-    
-    lower = grouped.quantile(0.05)  # 5th percentile
-    upper = grouped.quantile(0.95)  # 95th percentile
-    
     # combine into a summary DataFrame
-    summary = pd.DataFrame({
-        'lower_5th_pct': lower,
-        'upper_95th_pct': upper
-    }).reset_index()
+    summary = pd.DataFrame(bounds, columns=[percentile_col(p) for p in percentiles])
+    summary.insert(0, 'replicate_index', np.arange(store.n_replicates))
 
     # print results and save
     print('')
@@ -29,7 +96,55 @@ def get_upper_lower(asset1: str, asset2: str) -> None:
     print(summary)
     print('')
 
-    _save(summary, f'{asset1}_{asset2}_upper_lower_summary.csv')
+    if save:
+        _save(summary, f'{asset1}_{asset2}_upper_lower_summary.csv')
+
+    return summary
+
+
+def summarize_replicates(per_replicate: pd.DataFrame) -> pd.DataFrame:
+    # one row per statistic: mean, median and 95% interval across replicates
+    values = per_replicate.drop(columns=['replicate_index']).to_numpy()
+    bands = np.percentile(values, [2.5, 50, 97.5], axis=0)
+
+    return pd.DataFrame({
+        'mean': values.mean(axis=0),
+        'median': bands[1],
+        'ci_2.5th': bands[0],
+        'ci_97.5th': bands[2]
+    }, index=pd.Index(per_replicate.columns.drop('replicate_index'), name='stat'))
+
+
+def get_tail_summary(asset1: str, asset2: str, store: ReplicateStore = None, percentiles: list[float] = range(1, 100), es_levels: tuple[float, float] = (5, 95), save: bool = True, save_replicates: bool = False) -> tuple[pd.DataFrame, pd.DataFrame]:
+    print('')
+    print(' --- getting tail summary of replicates --- ')
+
+    if store is None:
+        store = ReplicateStore.load(f'{asset1}_{asset2}_replicates.npz')
+
+    percentiles = list(percentiles)
+    stats = tail_stats(store.values('change_pct'), percentiles, es_levels)
+
+    per_replicate = pd.DataFrame(stats)
+    per_replicate.insert(0, 'replicate_index', np.arange(store.n_replicates))
+
+    summary = summarize_replicates(per_replicate)
+
+    print('')
+    print(f'{len(percentiles)} percentiles, expected shortfall and max moves over {store.n_replicates} replicates:')
+    # the es levels are only on the percentile grid when they were asked for
+    shown = [percentile_col(es_levels[0]), percentile_col(es_levels[1]), f'es_{percentile_col(es_levels[0])}',
+             f'es_{percentile_col(es_levels[1])}', 'max_drawdown_pct', 'max_runup_pct']
+    print(summary.loc[[stat for stat in shown if stat in summary.index]])
+    print('')
+
+    if save_replicates:
+        _save(per_replicate, f'{asset1}_{asset2}_upper_lower_summary.csv')
+
+    if save:
+        _save(summary, f'{asset1}_{asset2}_tail_summary.csv', index=True)
+
+    return per_replicate, summary
 
 
 if __name__ == '__main__':
@@ -1,16 +1,92 @@
 #loadCSV.py
 
 import os
+import fnmatch
 import pandas as pd
 
 
+# copy-on-write is the default from pandas 3. with it a shallow copy of a cached frame is enough
+# to keep callers from writing through to the cache, before that every caller gets a deep copy
+COPY_ON_WRITE = int(pd.__version__.split('.')[0]) >= 3
+
+# every 'date' column is this type, whether parsed from a csv or built from the hourly store
+DATE_DTYPE = 'datetime64[ns]'
+
+
+# per file pattern: column dtypes (column names may be patterns) and date columns.
+# first matching pattern wins
+SCHEMAS = [
+    ('*_daily_closing_*utc.csv', {'*_closing_price_usd*': 'float64'}, ['date']),
+    ('*_price.csv', {'*': 'float64'}, ['date']),
+    ('*_price_change*.csv', {'ratio': 'float64', 'change_pct': 'float64', 'log_ratio_cum': 'float64'}, ['date']),
+    ('*_replicates_ordered.csv', {'replicate_index': 'int64', '*_price': 'float64', 'change_pct': 'float64'}, ['date']),
+    ('*_upper_lower_summary.csv', {'replicate_index': 'int64', '*_pct': 'float64'}, []),
+    ('*_ordered.csv', {'replicate_index': 'int64', '*_pct': 'float64'}, []),
+]
+
+# path -> ((mtime, size), DataFrame)
+_cache = {}
+
+# None -> the script folder, see set_data_dir
+_dataDirOverride = None
+
+
+def set_data_dir(path: str = None) -> None:
+    # point every load / save at another folder (e.g. the benchmark's temporary directory),
+    # None goes back to the script folder
+    global _dataDirOverride
+    _dataDirOverride = path
+
+
 def get_data_dir() -> str:
+    if _dataDirOverride is not None:
+        return os.path.abspath(_dataDirOverride)
+
     scriptDir = os.path.dirname(os.path.abspath(__file__))
     #dataDir = os.path.join(scriptDir, '..', 'data')
     dataDir = scriptDir #just put in the same folder as script..
     return os.path.abspath(dataDir)
 
 
+def clear_cache() -> None:
+    _cache.clear()
+
+
+def get_schema(fileName: str) -> tuple[dict, list[str]]:
+    for pattern, dtypes, dates in SCHEMAS:
+        if fnmatch.fnmatch(os.path.basename(fileName).lower(), pattern):
+            return dtypes, dates
+
+    return {}, []
+
+
+def read_with_schema(filePath: str) -> pd.DataFrame:
+    dtypes, dates = get_schema(filePath)
+
+    if not dtypes and not dates:
+        return pd.read_csv(filePath)
+
+    # resolve column patterns against the header only
+    header = pd.read_csv(filePath, nrows=0).columns
+
+    dtype = {}
+    for col in header:
+        if col in dates:
+            continue
+        for pattern, colType in dtypes.items():
+            if fnmatch.fnmatch(col, pattern):
+                dtype[col] = colType
+                break
+
+    df = pd.read_csv(filePath, dtype=dtype)
+
+    for col in dates:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format='%Y-%m-%d').astype(DATE_DTYPE)
+
+    return df
+
+
 def load_from_file(fileName: str, expectedCols: list[str]) -> pd.DataFrame:
     dataDir = get_data_dir()
     filePath = os.path.join(dataDir, fileName)
@@ -23,17 +99,25 @@ def load_from_file(fileName: str, expectedCols: list[str]) -> pd.DataFrame:
         print(f'file not found')
         #print(f'returning empty DataFrame with expected columns: {expectedCols}')
         return pd.DataFrame(columns=expectedCols)
-    
+
+    # reuse the parsed frame while the file is unchanged
+    stat = os.stat(filePath)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _cache.get(filePath)
+
+    if cached is not None and cached[0] == key:
+        print(f'file found (cached)')
+        df = cached[1]
     else:
         print(f'file found')
-
-    df = pd.read_csv(filePath)
+        df = read_with_schema(filePath)
+        _cache[filePath] = (key, df)
 
     missing = [col for col in expectedCols if col not in df.columns]
-    
+
     if missing:
         raise ValueError(f'missing expected column(s): {missing}')
     else:
         print(f'matching columns {expectedCols}')
 
-    return df
+    return df.copy(deep=not COPY_ON_WRITE)
@@ -1,21 +1,79 @@
 import requests
 import csv
+import glob
 import os
+import threading
+import time
+import numbers
+import numpy as np
 import pandas as pd
 from loadCSV import load_from_file as _load
-from saveCSV import save_to_file as _save
+from loadCSV import get_data_dir as _getDataDir
+from loadCSV import DATE_DTYPE
+from saveCSV import save_tail_to_file as _saveTail
 from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 
 
-def download_new_file(fileName: str, cryptoSymbol: str) -> bool:
-    existingDF = _load(fileName, ['date', f'{cryptoSymbol.lower()}_closing_price_usd'])
+# columns kept from every histohour candle
+HOURLY_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volumefrom', 'volumeto']
+
+# refreshes add tail segments next to the hourly store, past this many it is rewritten as one file
+MAX_HOURLY_SEGMENTS = 32
+
+# daily closings are taken from this UTC hour unless another is asked for (13:00 UTC = 22:00 KST)
+CLOSING_HOUR_UTC = 13
+
+# cryptocompare allows 50 calls per second on the free tier, stay well below it
+REQUESTS_PER_SECOND = 10
+
+
+class RateLimiter:
+    # spaces out calls from any number of threads to at most rate per second
+
+    def __init__(self, rate: float = REQUESTS_PER_SECOND):
+        self.interval = 1 / rate
+        self.lock = threading.Lock()
+        self.next_time = 0.0
+
+    def wait(self) -> None:
+        with self.lock:
+            now = time.monotonic()
+            wait_time = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+
+_session = None
+_session_lock = threading.Lock()
+_limiter = RateLimiter()
+
+
+def get_session() -> requests.Session:
+    # one pooled session shared by every download, so connections are reused
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount('https://', adapter)
+
+    return _session
+
+
+def download_new_file(fileName: str, cryptoSymbol: str, existingDF: pd.DataFrame = None, target_hour_utc: int = CLOSING_HOUR_UTC) -> bool:
+    if existingDF is None:
+        existingDF = _load(fileName, ['date', f'{cryptoSymbol.lower()}_closing_price_usd'])
 
     if existingDF.empty:
         print('no existing data.. downloading new data..')
         return True
 
-    latest_str = existingDF.iloc[-1]['date']
-    latest_date = datetime.strptime(latest_str, '%Y-%m-%d').date()
+    latest_date = pd.to_datetime(existingDF.iloc[-1]['date']).date()
     print(f'latest entry date: {latest_date}')
 
     now_utc = datetime.now(timezone.utc)
@@ -23,8 +81,6 @@ def download_new_file(fileName: str, cryptoSymbol: str) -> bool:
     print(f'current utc date: {current_date_utc}')
     print(f'current utc time: {now_utc.strftime("%H:%M:%S")} UTC')
 
-    target_hour_utc = 13  # corresponds to 22:00 KST
-
     if now_utc.hour >= target_hour_utc:
         expected_latest_date = current_date_utc
     else:
@@ -40,43 +96,41 @@ def download_new_file(fileName: str, cryptoSymbol: str) -> bool:
         return False
 
 
-def download_crypto_daily_closing(crypto_symbol: str, fiat_symbol: str = 'usd', years: int = 2) -> None:
-    print('')
-    print(f' --- checking data on {crypto_symbol} --- ')
+def fetch_histohour(crypto_symbol: str, fiat_symbol: str, since_ts: int, session: requests.Session = None, limiter: RateLimiter = None) -> list[dict]:
+    # page backwards through histohour with toTs until since_ts is covered.
+    # the first page is only as long as needed, so a short gap costs a single request
+    url = 'https://min-api.cryptocompare.com/data/v2/histohour'
 
-    fileName = f'{crypto_symbol.lower()}_daily_closing.csv'
+    if session is None:
+        session = get_session()
+    if limiter is None:
+        limiter = _limiter
 
-    if not download_new_file(fileName, crypto_symbol):
-        # skip download if existing data is good
-        return
-    
-    url = 'https://min-api.cryptocompare.com/data/v2/histohour'
-    
-    # Fetch all hourly data needed (~2+ years)
-    hourly_data = []
-    cutoff_days = years * 365 + 30
-    cutoff_time = int((datetime.now(timezone.utc) - timedelta(days=cutoff_days)).timestamp())
+    now_ts = int(datetime.now(timezone.utc).timestamp())
+    limit = max(1, min(2000, (now_ts - since_ts) // 3600 + 1))
 
+    hourly_data = []
     to_ts = None
     while True:
         params = {
             'fsym': crypto_symbol.upper(),
             'tsym': fiat_symbol.upper(),
-            'limit': 2000,
+            'limit': limit,
             'aggregate': 1
         }
         if to_ts is not None:
             params['toTs'] = to_ts
 
         try:
-            response = requests.get(url, params=params)
+            limiter.wait()
+            response = session.get(url, params=params)
             response.raise_for_status()
             data = response.json()
         except requests.exceptions.RequestException as e:
             raise Exception(f'request failed: {e}')
    
         if data['Response'] != 'Success':
-            raise Exception(f'API error: {data.get('Message', 'Unknown error')}')
+            raise Exception(f'API error: {data.get("Message", "Unknown error")}')
         
         batch = data['Data']['Data']
         if not batch:
@@ -84,55 +138,221 @@ def download_crypto_daily_closing(crypto_symbol: str, fiat_symbol: str = 'usd',
 
         hourly_data.extend(batch)
 
-        if len(batch) < 2000:
+        if len(batch) < limit:
             break
 
         oldest_time = batch[0]['time']  # oldest in this batch
         to_ts = oldest_time - 1
 
-        if oldest_time < cutoff_time:
+        if oldest_time <= since_ts:
             break
 
-    if not hourly_data:
-        raise Exception('no data returned from the API')
+        limit = 2000
 
     # sort just in case
     hourly_data.sort(key=lambda x: x['time'])
 
-    # Filter to recent data
-    recent_data = [entry for entry in hourly_data if entry['time'] >= cutoff_time]
+    return hourly_data
 
-    # Select only the 13:00 UTC hour (22:00 KST) and use its open price ≈ price at 22:00 KST
-    target_hour = 13
-    selected_data = []
-    for entry in recent_data:
-        entry_dt = datetime.fromtimestamp(entry['time'], tz=timezone.utc)
-        if entry_dt.hour == target_hour:
-            selected_data.append(entry)
 
-    if not selected_data:
-        raise Exception('no selected data after filtering')
+def daily_closing_file(crypto_symbol: str, hour_utc: int = CLOSING_HOUR_UTC) -> str:
+    # the cut hour is part of the name, so closings taken at different hours never overwrite each other
+    return f'{crypto_symbol.lower()}_daily_closing_{hour_utc:02d}utc.csv'
+
+
+def get_hourly_path(crypto_symbol: str) -> str:
+    return os.path.abspath(os.path.join(_getDataDir(), f'{crypto_symbol.lower()}_hourly.npz'))
+
+
+def get_hourly_segments(crypto_symbol: str) -> list[str]:
+    # tail segments written by append_hourly, oldest first (btc_hourly.0000.npz, btc_hourly.0001.npz, ..)
+    return sorted(glob.glob(get_hourly_path(crypto_symbol)[:-len('.npz')] + '.[0-9]*.npz'))
+
+
+def load_hourly(crypto_symbol: str) -> pd.DataFrame:
+    # full hourly history, one numpy column per field: the store plus its tail segments,
+    # later segments win on overlapping hours
+    filePath = get_hourly_path(crypto_symbol)
+    segments = get_hourly_segments(crypto_symbol)
+
+    print('')
+    print(f'attempting to load: {filePath}' + (f' (+{len(segments)} tail segments)' if segments else ''))
+
+    parts = []
+    for path in ([filePath] if os.path.exists(filePath) else []) + segments:
+        with np.load(path) as data:
+            parts.append(pd.DataFrame({col: data[col] for col in HOURLY_COLUMNS}))
+
+    if not parts:
+        print('file not found')
+        return pd.DataFrame({col: np.array([], dtype=np.int64 if col == 'time' else np.float64) for col in HOURLY_COLUMNS})
+
+    if len(parts) == 1:
+        return parts[0]
+
+    hourly = pd.concat(parts, ignore_index=True).drop_duplicates(subset='time', keep='last').sort_values('time')
+    return hourly.reset_index(drop=True)
+
+
+def save_hourly(crypto_symbol: str, hourly: pd.DataFrame) -> None:
+    # the whole history as one file, any tail segments are folded into it
+    filePath = get_hourly_path(crypto_symbol)
+
+    np.savez(filePath, **{col: hourly[col].to_numpy() for col in HOURLY_COLUMNS})
+    for path in get_hourly_segments(crypto_symbol):
+        os.remove(path)
+
+    print(f'hourly store saved to: {filePath}')
+
+
+def append_hourly(crypto_symbol: str, hourly: pd.DataFrame, since_ts: int) -> None:
+    # write only the candles from since_ts on as a new tail segment, the stored history is not rewritten.
+    # too many segments → one full rewrite
+    segments = get_hourly_segments(crypto_symbol)
+
+    if not os.path.exists(get_hourly_path(crypto_symbol)) or len(segments) >= MAX_HOURLY_SEGMENTS:
+        save_hourly(crypto_symbol, hourly)
+        return
+
+    tail = hourly[hourly['time'] >= since_ts]
+    index = int(segments[-1].rsplit('.', 2)[1]) + 1 if segments else 0
+    filePath = get_hourly_path(crypto_symbol)[:-len('.npz')] + f'.{index:04d}.npz'
 
-    # latest entry (for printing)
-    latest_entry = selected_data[-1]
-    latest_date = datetime.fromtimestamp(latest_entry['time']).strftime('%Y-%m-%d')
-    latest_price = latest_entry['open']  # open of the 13:00 UTC hour
+    np.savez(filePath, **{col: tail[col].to_numpy() for col in HOURLY_COLUMNS})
 
+    print(f'{len(tail)} hourly candles saved to: {filePath}')
+
+
+def merge_hourly(hourly: pd.DataFrame, hourly_data: list[dict]) -> pd.DataFrame:
+    # append fetched candles, newer values win on overlapping hours
+    if not hourly_data:
+        return hourly
+
+    newDF = pd.DataFrame(hourly_data)[HOURLY_COLUMNS].astype({'time': np.int64})
+    newDF[HOURLY_COLUMNS[1:]] = newDF[HOURLY_COLUMNS[1:]].astype(np.float64)
+
+    merged = pd.concat([hourly, newDF], ignore_index=True)
+    merged = merged.drop_duplicates(subset='time', keep='last').sort_values('time')
+
+    return merged.reset_index(drop=True)
+
+
+def select_daily_closing(hourly: pd.DataFrame, crypto_symbol: str, hours_utc=CLOSING_HOUR_UTC) -> pd.DataFrame:
+    # daily series from the open of the given UTC hour (13:00 UTC = 22:00 KST).
+    # several hours give one price column per hour, e.g. btc_closing_price_usd_01utc
+    symbol = crypto_symbol.lower()
+    multi = not isinstance(hours_utc, numbers.Integral)
+    hours = [int(h) for h in hours_utc] if multi else [int(hours_utc)]
+
+    time = hourly['time'].to_numpy()
+    hour = (time // 3600) % 24
+    day = time // 86400
+
+    mask = np.isin(hour, hours)
+    picked = pd.DataFrame({'day': day[mask], 'hour': hour[mask], 'open': hourly['open'].to_numpy()[mask]})
+
+    if not multi:
+        daily = picked[['day', 'open']].rename(columns={'open': f'{symbol}_closing_price_usd'})
+    else:
+        daily = picked.pivot(index='day', columns='hour', values='open').reindex(columns=hours).reset_index()
+        daily.columns = ['day'] + [f'{symbol}_closing_price_usd_{h:02d}utc' for h in hours]
+
+    # datetime64 dates, the same type loadCSV parses the saved files into
+    daily.insert(0, 'date', pd.to_datetime(daily['day'].to_numpy() * 86400, unit='s').astype(DATE_DTYPE))
+
+    return daily.drop(columns=['day']).reset_index(drop=True)
+
+
+def get_daily_closing(crypto_symbol: str, hours_utc=CLOSING_HOUR_UTC, years: int = None) -> pd.DataFrame:
+    # daily closing series for any cut hour(s) straight from the local hourly store, no network
+    daily = select_daily_closing(load_hourly(crypto_symbol), crypto_symbol, hours_utc)
+
+    if years is not None:
+        daily = trim_to_window(daily, years)
+
+    return daily
+
+
+def trim_to_window(df: pd.DataFrame, years: int) -> pd.DataFrame:
+    # incremental updates only append, so the stored file can hold more history than asked for
+    if df.empty:
+        return df
+
+    cutoff_days = years * 365 + 30
+    cutoff_date = pd.Timestamp(datetime.now(timezone.utc).date() - timedelta(days=cutoff_days))
+
+    return df[df['date'] >= cutoff_date].reset_index(drop=True)
+
+
+def download_crypto_daily_closing(crypto_symbol: str, fiat_symbol: str = 'usd', years: int = 2, incremental: bool = True, hour_utc: int = CLOSING_HOUR_UTC) -> pd.DataFrame:
     print('')
-    print(f'latest closing price: ${latest_price:,.2f} on {latest_date} (~22:00 KST)')
-    print(f'fetched {len(hourly_data)} total hourly points')
-    print(f'selected {len(selected_data)} daily points (22:00 KST) for the last ~{years} years')
+    print(f' --- checking data on {crypto_symbol} --- ')
 
-    # convert to DataFrame and save to file
-    rows = []
-    for entry in selected_data:
-        date_str = datetime.fromtimestamp(entry['time']).strftime('%Y-%m-%d')
-        price = entry['open']
-        rows.append({'date': date_str, f'{crypto_symbol.lower()}_closing_price_usd': price})
+    fileName = daily_closing_file(crypto_symbol, hour_utc)
 
-    df = pd.DataFrame(rows)
+    # every fetched candle is kept in the hourly store, the daily file is derived from it
+    hourly = load_hourly(crypto_symbol)
+    daily = select_daily_closing(hourly, crypto_symbol, hour_utc)
+
+    if not download_new_file(fileName, crypto_symbol, daily, hour_utc):
+        # skip download if existing data is good
+        return trim_to_window(daily, years)
+
+    cutoff_days = years * 365 + 30
+    cutoff_time = int((datetime.now(timezone.utc) - timedelta(days=cutoff_days)).timestamp())
+
+    if incremental and not hourly.empty and hourly['time'].iloc[0] <= cutoff_time:
+        # only fetch the hours after the last stored candle
+        last_ts = int(hourly['time'].iloc[-1])
+        print(f'incremental update after {datetime.fromtimestamp(last_ts, tz=timezone.utc):%Y-%m-%d %H:%M} UTC..')
+        hourly_data = fetch_histohour(crypto_symbol, fiat_symbol, last_ts)
+    else:
+        # Fetch all hourly data needed (~2+ years)
+        hourly_data = fetch_histohour(crypto_symbol, fiat_symbol, cutoff_time)
+
+    if not hourly_data:
+        raise Exception('no data returned from the API')
+
+    # only the fetched hours are written, to a tail segment of the store and the tail of the daily file
+    since_ts = min(candle['time'] for candle in hourly_data)
+    extends = not hourly.empty and since_ts > hourly['time'].iloc[0]
+
+    hourly = merge_hourly(hourly, hourly_data)
+    if extends:
+        append_hourly(crypto_symbol, hourly, since_ts)
+    else:
+        save_hourly(crypto_symbol, hourly)
+
+    df = trim_to_window(select_daily_closing(hourly, crypto_symbol, hour_utc), years)
+
+    if df.empty:
+        raise Exception('no selected data after filtering')
+
+    print('')
+    print(f'latest closing price: ${df.iloc[-1, 1]:,.2f} on {df.iloc[-1, 0]:%Y-%m-%d} ({hour_utc:02d}:00 UTC)')
+    print(f'fetched {len(hourly_data)} hourly points, {len(hourly)} stored')
+    print(f'selected {len(df)} daily points ({hour_utc:02d}:00 UTC) for the last ~{years} years')
+
+    _saveTail(df, fileName, 'date', since=pd.Timestamp(since_ts // 86400 * 86400, unit='s'))
+
+    return df
+
+
+def download_assets(crypto_symbols: list[str], fiat_symbol: str = 'usd', years: int = 2, max_workers: int = None, **kwargs) -> dict[str, pd.DataFrame]:
+    # download any number of assets concurrently over the shared session and rate limiter.
+    # returns the daily closing frames keyed by symbol, in the order given
+    symbols = list(dict.fromkeys(crypto_symbols))
+
+    if max_workers is None:
+        max_workers = min(8, len(symbols))
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = {
+            symbol: pool.submit(download_crypto_daily_closing, symbol, fiat_symbol, years, **kwargs)
+            for symbol in symbols
+        }
 
-    _save(df, fileName)
+        return {symbol: future.result() for symbol, future in futures.items()}
 
 
 if __name__ == '__main__':
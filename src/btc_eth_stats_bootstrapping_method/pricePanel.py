@@ -0,0 +1,77 @@
+# pricePanel.py
+
+import os
+import numpy as np
+import pandas as pd
+from loadCSV import get_data_dir as _getDataDir
+from loadCSV import DATE_DTYPE
+
+
+class PricePanel:
+    # daily closing prices of N assets joined once on date -> (days x N) float matrix.
+    # every pairwise log ratio is kept for the upper triangle only (i < j), the reverse pair is its negation.
+    # an asset without a price on some date holds NaN there, a pair uses the dates both assets have
+
+    def __init__(self, dates: np.ndarray, assets: list[str], prices: np.ndarray):
+        self.dates = np.asarray(dates, dtype='datetime64[D]')
+        self.assets = [asset.lower() for asset in assets]
+        self.prices = np.asarray(prices, dtype=np.float64)
+        self._column = {asset: i for i, asset in enumerate(self.assets)}
+
+        # (days x pairs) log ratios, all pairs in one broadcast
+        self.pair_i, self.pair_j = np.triu_indices(len(self.assets), k=1)
+        log_prices = np.log(self.prices)
+        self.log_ratios = log_prices[:, self.pair_i] - log_prices[:, self.pair_j]
+
+    @property
+    def pairs(self) -> list[tuple[str, str]]:
+        return [(self.assets[i], self.assets[j]) for i, j in zip(self.pair_i, self.pair_j)]
+
+    def _columns(self, asset1: str, asset2: str) -> tuple[int, int]:
+        missing = [asset for asset in (asset1.lower(), asset2.lower()) if asset not in self._column]
+
+        if missing:
+            raise KeyError(f'asset(s) not in panel: {missing} (panel has {self.assets})')
+
+        return self._column[asset1.lower()], self._column[asset2.lower()]
+
+    def log_ratio(self, asset1: str, asset2: str) -> np.ndarray:
+        # log(asset1 / asset2) on every panel date
+        col1, col2 = self._columns(asset1, asset2)
+        n = len(self.assets)
+
+        if col1 < col2:
+            return self.log_ratios[:, col1 * n - col1 * (col1 + 1) // 2 + col2 - col1 - 1]
+
+        return -self.log_ratios[:, col2 * n - col2 * (col2 + 1) // 2 + col1 - col2 - 1]
+
+    def pair(self, asset1: str, asset2: str) -> pd.DataFrame:
+        # same layout as the get_price_ratio output: date, asset1, asset2, ratio
+        asset1 = asset1.lower()
+        asset2 = asset2.lower()
+        col1, col2 = self._columns(asset1, asset2)
+
+        price1 = self.prices[:, col1]
+        price2 = self.prices[:, col2]
+        common = ~(np.isnan(price1) | np.isnan(price2))
+
+        return pd.DataFrame({
+            'date': self.dates[common].astype(DATE_DTYPE),
+            asset1: price1[common],
+            asset2: price2[common],
+            'ratio': price1[common] / price2[common]
+        })
+
+    def save(self, fileName: str) -> None:
+        filePath = os.path.abspath(os.path.join(_getDataDir(), fileName.lower()))
+
+        # prices only, the log ratios follow from them
+        np.savez(
+            filePath,
+            dates=self.dates,
+            assets=np.array(self.assets),
+            prices=self.prices
+        )
+
+        print(f'price panel saved to: {filePath}')
+
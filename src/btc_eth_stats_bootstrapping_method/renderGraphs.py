@@ -0,0 +1,35 @@
+# renderGraphs.py
+
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+
+
+def use_headless() -> None:
+    # non-interactive backend, figures are only ever written to file
+    plt.switch_backend('Agg')
+
+
+def show_figure(fig, headless: bool = False) -> None:
+    # headless runs only write the file, so the figure is released right away.
+    # interactive runs show it without blocking and keep going, release_figures() closes it at the end
+    if headless:
+        plt.close(fig)
+    else:
+        plt.show(block=False)
+
+
+def release_figures(headless: bool = False) -> None:
+    # end of an interactive run: the windows stay up until they are closed by hand, then every figure is freed
+    if not headless and plt.get_fignums():
+        plt.show()
+    plt.close('all')
+
+
+def render_graphs(jobs: list[tuple], workers: int = None) -> None:
+    # jobs are (draw function, args) pairs, e.g. (draw_graph, (asset1, asset2, df)).
+    # every job is drawn headless in a worker process, so no figure outlives its file
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_headless) as pool:
+        futures = [pool.submit(draw_function, *args, headless=True) for draw_function, args in jobs]
+
+        for future in futures:
+            future.result()
@@ -0,0 +1,167 @@
+# replicateStore.py
+
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from loadCSV import load_from_file as _load
+from loadCSV import get_data_dir as _getDataDir
+from loadCSV import DATE_DTYPE
+from resampling import block_indices, check_method
+
+
+def source_fingerprint(source: pd.DataFrame) -> dict[str, str]:
+    # first / last date and a hash of the dates and changes. the daily refresh keeps the row count
+    # and moves the window forward, so the length alone does not tell two sources apart
+    dates = source['date'].to_numpy().astype(DATE_DTYPE)
+    changes = np.ascontiguousarray(source['change_pct'].to_numpy(dtype=np.float64))
+
+    return {
+        'first_date': str(dates[0])[:10] if len(dates) else '',
+        'last_date': str(dates[-1])[:10] if len(dates) else '',
+        'hash': hashlib.sha256(dates.view(np.int64).tobytes() + changes.tobytes()).hexdigest()
+    }
+
+
+class ReplicateStore:
+    # a set of bootstrap replicates stored as block start offsets into the source price_change series.
+    # rows are only gathered from the source when a consumer asks for them.
+    # stationary blocks have random lengths, so for that method starts holds the full
+    # (replicates x rows) index matrix and block_size is the mean block length
+
+    def __init__(self, starts: np.ndarray, block_size: float, source_file: str, source: pd.DataFrame = None, seed: int = None, method: str = 'circular'):
+        self.method = check_method(method)
+        self.starts = np.asarray(starts, dtype=np.int32)
+        self.block_size = float(block_size) if self.method == 'stationary' else int(block_size)
+        self.source_file = source_file
+        self.seed = seed
+        self._source = source
+        self._indices = None
+
+    @property
+    def n_replicates(self) -> int:
+        return self.starts.shape[0]
+
+    @property
+    def rows_per_replicate(self) -> int:
+        if self.method == 'stationary':
+            return self.starts.shape[1]
+
+        return self.starts.shape[1] * self.block_size
+
+    @property
+    def source(self) -> pd.DataFrame:
+        if self._source is None:
+            self._source = _load(self.source_file, ['date', 'ratio', 'change_pct'])
+
+        return self._source
+
+    def indices(self) -> np.ndarray:
+        # (replicates x rows) row indices into the source
+        if self._indices is None:
+            if self.method == 'stationary':
+                self._indices = self.starts
+            else:
+                self._indices = block_indices(self.starts, self.block_size, len(self.source))
+
+        return self._indices
+
+    def values(self, col: str = 'change_pct') -> np.ndarray:
+        # (replicates x rows) matrix of one source column
+        return self.source[col].to_numpy()[self.indices()]
+
+    def replicate(self, repIndex: int, price_col_name: str = 'ratio') -> pd.DataFrame:
+        return self._frame(self.indices()[repIndex:repIndex + 1], price_col_name, firstRep=repIndex)
+
+    def to_frame(self, price_col_name: str = 'ratio') -> pd.DataFrame:
+        # full replicate table: replicate_index, block_index, date, price, change_pct
+        return self._frame(self.indices(), price_col_name)
+
+    def _frame(self, indices: np.ndarray, price_col_name: str, firstRep: int = 0) -> pd.DataFrame:
+        n_replicates, rows_per_replicate = indices.shape
+        flat = indices.ravel()
+
+        rep_index = np.repeat(np.arange(firstRep, firstRep + n_replicates), rows_per_replicate)
+        if self.method == 'stationary':
+            # a block ends wherever the next row is not the following source row
+            breaks = np.diff(indices, axis=1) != 1
+            block_index = np.concatenate([np.zeros((n_replicates, 1), dtype=np.int64), np.cumsum(breaks, axis=1)], axis=1).ravel()
+        else:
+            block_index = np.tile(np.arange(rows_per_replicate) // self.block_size, n_replicates)
+
+        return pd.DataFrame({
+            'replicate_index': rep_index,
+            'block_index': block_index,
+            'date': self.source['date'].to_numpy()[flat],
+            price_col_name: self.source['ratio'].to_numpy()[flat],
+            'change_pct': self.source['change_pct'].to_numpy()[flat]
+        })
+
+    def save(self, fileName: str) -> None:
+        filePath = os.path.abspath(os.path.join(_getDataDir(), fileName.lower()))
+
+        # the source rows travel with the starts, so the store reloads without its csv
+        # (only written as a checkpoint) and a different source is caught on load
+        fingerprint = source_fingerprint(self.source)
+        np.savez(
+            filePath,
+            starts=self.starts,
+            block_size=np.float64(self.block_size),
+            method=np.str_(self.method),
+            source_file=np.str_(self.source_file),
+            source_rows=np.int64(len(self.source)),
+            source_date=self.source['date'].to_numpy().astype(DATE_DTYPE).view(np.int64),
+            source_ratio=self.source['ratio'].to_numpy(dtype=np.float64),
+            source_change_pct=self.source['change_pct'].to_numpy(dtype=np.float64),
+            source_first_date=np.str_(fingerprint['first_date']),
+            source_last_date=np.str_(fingerprint['last_date']),
+            source_hash=np.str_(fingerprint['hash']),
+            seed=np.str_('' if self.seed is None else str(self.seed))
+        )
+
+        print(f'replicate store saved to: {filePath}')
+
+    @classmethod
+    def load(cls, fileName: str, source: pd.DataFrame = None) -> 'ReplicateStore':
+        filePath = os.path.abspath(os.path.join(_getDataDir(), fileName))
+
+        print('')
+        print(f'attempting to load: {filePath}')
+
+        if not os.path.exists(filePath):
+            raise FileNotFoundError(f'replicate store not found: {filePath}')
+
+        with np.load(filePath) as data:
+            seed = str(data['seed']) if 'seed' in data.files else ''
+            method = str(data['method']) if 'method' in data.files else 'circular'
+            source_rows = int(data['source_rows'])
+
+            stored = None
+            if 'source_hash' in data.files:
+                stored = {
+                    'first_date': str(data['source_first_date']),
+                    'last_date': str(data['source_last_date']),
+                    'hash': str(data['source_hash'])
+                }
+
+                # no source given -> the embedded rows are the source
+                if source is None:
+                    source = pd.DataFrame({
+                        'date': data['source_date'].view(DATE_DTYPE),
+                        'ratio': data['source_ratio'],
+                        'change_pct': data['source_change_pct']
+                    })
+
+            store = cls(data['starts'], float(data['block_size']), str(data['source_file']), source, int(seed) if seed else None, method)
+
+        if len(store.source) != source_rows:
+            raise ValueError(f'source {store.source_file} has {len(store.source)} rows, replicates were drawn from {source_rows}')
+
+        # stores saved before the fingerprint only carry the row count
+        if stored is not None:
+            current = source_fingerprint(store.source)
+            if current != stored:
+                raise ValueError(f"source {store.source_file} covers {current['first_date']} to {current['last_date']}, "
+                                 f"replicates were drawn from {stored['first_date']} to {stored['last_date']} (or its values changed)")
+
+        return store
@@ -0,0 +1,279 @@
+# resampling.py
+#
+# vectorized block bootstrap index generators shared by the bootstrapping pipeline
+# and the hourly ratio analyzer.
+#   moving     - fixed length blocks that never run past the end of the series
+#   circular   - fixed length blocks that wrap around the end of the series
+#   stationary - geometric block lengths with the given mean, wrapping (Politis & Romano)
+
+import math
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+METHODS = ('moving', 'circular', 'stationary')
+
+# resampled values held at once by block_bootstrap (float64 -> 32 MB)
+CHUNK_ELEMENTS = 4_000_000
+
+
+def check_method(method: str) -> str:
+    method = method.lower().strip()
+
+    if method not in METHODS:
+        raise ValueError(f'unknown bootstrap method: {method} (expected one of {METHODS})')
+
+    return method
+
+
+def sqrt_block_size(n: int) -> int:
+    # sqrt heuristic
+    return max(1, round(math.sqrt(n)))
+
+
+def optimal_block_length(x: np.ndarray, method: str = 'circular') -> float:
+    # automatic block length from Politis & White (2004), with the correction of Patton, Politis & White (2009).
+    # moving and circular share the same optimum, stationary uses its own constant
+    method = check_method(method)
+
+    x = np.asarray(x, dtype=np.float64)
+    n = len(x)
+
+    if n < 3:
+        return 1.0
+
+    kn = max(5, math.ceil(math.sqrt(math.log10(n))))
+    m_max = min(math.ceil(math.sqrt(n)) + kn, n - 1)
+    b_max = math.ceil(min(3 * math.sqrt(n), n / 3))
+
+    # autocovariances up to m_max through one fft
+    xc = x - x.mean()
+    spec = np.fft.rfft(xc, 2 * n)
+    acov = np.fft.irfft(spec * np.conj(spec))[:m_max + 1] / n
+
+    if acov[0] <= 0:
+        return 1.0
+
+    rho = acov / acov[0]
+
+    # smallest lag m after which kn consecutive autocorrelations are insignificant
+    insignificant = np.abs(rho[1:]) < 2 * math.sqrt(math.log10(n) / n)
+
+    if len(insignificant) >= kn:
+        runs = sliding_window_view(insignificant, kn).all(axis=1)
+    else:
+        runs = np.zeros(0, dtype=bool)
+
+    if runs.any():
+        m_hat = int(np.argmax(runs))
+    else:
+        significant = np.flatnonzero(~insignificant)
+        m_hat = int(significant[-1]) + 1 if len(significant) else 1
+
+    big_m = min(2 * max(m_hat, 1), m_max)
+
+    # flat-top lag window
+    lags = np.arange(-big_m, big_m + 1)
+    frac = np.abs(lags) / big_m
+    lam = np.where(frac <= 0.5, 1.0, 2 * (1 - frac))
+    cov = acov[np.abs(lags)]
+
+    g = np.sum(lam * np.abs(lags) * cov)
+    g0 = np.sum(lam * cov)
+
+    if method == 'stationary':
+        d = 2 * g0 ** 2
+    else:
+        d = 4 / 3 * g0 ** 2
+
+    if d <= 0:
+        return 1.0
+
+    b = (2 * g ** 2 / d) ** (1 / 3) * n ** (1 / 3)
+    return float(min(max(b, 1.0), b_max))
+
+
+def resolve_block_size(x: np.ndarray, block_size, method: str = 'circular') -> float:
+    # None -> sqrt heuristic, 'auto' -> Politis & White estimate, otherwise the given size.
+    # fixed blocks are a whole number of rows (int), the stationary bootstrap only needs the
+    # mean of its geometric block lengths, so that stays real-valued (float).
+    # a fixed block never runs longer than the series (n rows)
+    stationary = check_method(method) == 'stationary'
+    n = max(1, len(x))
+
+    if block_size is None:
+        size = sqrt_block_size(len(x))
+        return float(size) if stationary else min(size, n)
+
+    if isinstance(block_size, str):
+        if block_size.lower().strip() != 'auto':
+            raise ValueError(f'block size must be a number, None or "auto", got: {block_size}')
+        size = optimal_block_length(x, method)
+        return max(1.0, float(size)) if stationary else min(max(1, round(size)), n)
+
+    return max(1.0, float(block_size)) if stationary else min(max(1, round(block_size)), n)
+
+
+def draw_starts(n: int, block_size: int, n_boot: int, n_blocks: int, method: str = 'circular', rng: np.random.Generator = None) -> np.ndarray:
+    # every block start of every resample in one call -> (n_boot x n_blocks)
+    if rng is None:
+        rng = np.random.default_rng()
+
+    if check_method(method) == 'moving':
+        high = max(1, n - block_size + 1)
+    else:
+        high = n
+
+    return rng.integers(0, high, size=(n_boot, n_blocks), dtype=np.int32)
+
+
+def block_indices(starts: np.ndarray, block_size: int, n: int) -> np.ndarray:
+    # broadcast block starts against in-block offsets and wrap around the end of the series.
+    # moving-block starts never reach the end, so the wrap is a no-op for them
+    offsets = np.arange(block_size, dtype=np.int32)
+    indices = starts[:, :, np.newaxis] + offsets
+    np.remainder(indices, n, out=indices)
+
+    # (n_boot x n_blocks x block_size) -> (n_boot x rows)
+    return indices.reshape(starts.shape[0], -1)
+
+
+def stationary_indices(n: int, block_size: float, n_boot: int, length: int, rng: np.random.Generator = None) -> np.ndarray:
+    # geometric block lengths with mean block_size, wrapping -> (n_boot x length).
+    # blocks are laid end to end in one stream that is then cut into rows. a block cut at a row
+    # boundary still has a uniform position and a geometric remaining length (memorylessness),
+    # so every row is a proper stationary bootstrap resample
+    if rng is None:
+        rng = np.random.default_rng()
+
+    total = n_boot * length
+    p = 1 / block_size
+
+    lens = rng.geometric(p, size=int(total * p * 1.1) + 16)
+    while lens.sum() < total:
+        lens = np.concatenate([lens, rng.geometric(p, size=int(total * p * 0.1) + 16)])
+
+    ends = np.cumsum(lens)
+    k = int(np.searchsorted(ends, total)) + 1
+    lens = lens[:k]
+    first = ends[:k] - lens
+
+    # index = start of the block + position in the stream - first position of the block
+    starts = rng.integers(0, n, size=k)
+    shift = np.remainder(starts - first, n).astype(np.int32)
+
+    indices = np.repeat(shift, lens)[:total]
+    indices += np.arange(total, dtype=np.int32)
+    np.remainder(indices, n, out=indices)
+
+    return indices.reshape(n_boot, length)
+
+
+def resample_indices(n: int, n_boot: int, block_size: float, method: str = 'circular', length: int = None, rng: np.random.Generator = None) -> np.ndarray:
+    # (n_boot x length) indices into a series of n rows, length defaults to n
+    method = check_method(method)
+
+    if length is None:
+        length = n
+
+    if method == 'stationary':
+        return stationary_indices(n, block_size, n_boot, length, rng)
+
+    block_size = int(block_size)
+    n_blocks = math.ceil(length / block_size)
+    starts = draw_starts(n, block_size, n_boot, n_blocks, method, rng)
+
+    return block_indices(starts, block_size, n)[:, :length]
+
+
+def block_bootstrap(data: np.ndarray, statistic, n_boot: int, block_size: float, method: str = 'circular', rng: np.random.Generator = None, length: int = None, max_elements: int = CHUNK_ELEMENTS) -> np.ndarray:
+    # statistic(samples) reduces a (chunk x length) block of resamples along axis 1 -> (chunk,) or (chunk x k).
+    # resamples are drawn and reduced a chunk at a time, so memory stays at max_elements values
+    # whatever n_boot is. fixed length blocks are gathered from a sliding-window view of the series
+    method = check_method(method)
+    data = np.asarray(data)
+    n = len(data)
+
+    if length is None:
+        length = n
+    if rng is None:
+        rng = np.random.default_rng()
+
+    chunk = max(1, max_elements // length)
+
+    if method != 'stationary':
+        block_size = int(block_size)
+        if not 1 <= block_size <= n:
+            raise ValueError(f'block size {block_size} does not fit a series of {n} rows')
+
+        n_blocks = math.ceil(length / block_size)
+
+        # circular blocks read past the end, so the view runs over the series plus its first block
+        # (at most one wrap, block_size <= n)
+        series = data if method == 'moving' else np.concatenate([data, data[:block_size - 1]])
+        windows = sliding_window_view(series, block_size)
+
+    results = []
+    for first in range(0, n_boot, chunk):
+        size = min(chunk, n_boot - first)
+
+        if method == 'stationary':
+            samples = data[stationary_indices(n, block_size, size, length, rng)]
+        else:
+            starts = draw_starts(n, block_size, size, n_blocks, method, rng)
+            samples = windows[starts].reshape(size, -1)[:, :length]
+
+        results.append(statistic(samples))
+
+    return np.concatenate(results)
+
+
+def monte_carlo_error(stats: np.ndarray, ci: tuple[float, float] = (2.5, 97.5), n_groups: int = 10) -> np.ndarray:
+    # standard error of the mean and of the CI endpoints of every tracked statistic,
+    # from the spread across n_groups equal groups of replicates (batch means) -> (3 x k)
+    stats = np.asarray(stats, dtype=np.float64).reshape(len(stats), -1)
+    n = len(stats)
+
+    se_mean = stats.std(axis=0, ddof=1) / math.sqrt(n)
+
+    group_size = n // n_groups
+    if group_size < 2:
+        return np.vstack([se_mean, np.full_like(se_mean, np.inf), np.full_like(se_mean, np.inf)])
+
+    groups = stats[:group_size * n_groups].reshape(n_groups, group_size, -1)
+    endpoints = np.percentile(groups, ci, axis=1)  # (2 x n_groups x k)
+    se_ci = endpoints.std(axis=1, ddof=1) / math.sqrt(n_groups)
+
+    return np.vstack([se_mean, se_ci])
+
+
+def run_until_converged(draw_batch, tol: float, batch_size: int, max_replicates: int, min_replicates: int = None, track=None) -> tuple[np.ndarray, dict]:
+    # draw_batch(n) -> (n x k) statistics for n new replicates.
+    # replicates are added a batch at a time until the monte carlo error of every tracked mean
+    # and CI endpoint is below tol, or the budget runs out. track selects the columns held to tol
+    # (all by default), e.g. only those in the units tol is given in
+    if min_replicates is None:
+        min_replicates = 2 * batch_size
+
+    batches = []
+    total = 0
+    precision = np.inf
+
+    while total < max_replicates:
+        n = min(batch_size, max_replicates - total)
+        batch = np.asarray(draw_batch(n), dtype=np.float64)
+        batches.append(batch.reshape(n, -1))
+        total += n
+
+        stats = np.concatenate(batches)
+        precision = float(monte_carlo_error(stats if track is None else stats[:, track]).max())
+
+        if total >= min_replicates and precision <= tol:
+            break
+
+    stats = np.concatenate(batches)
+    info = {'replicates': total, 'precision': precision, 'converged': precision <= tol}
+
+    print(f"replicates used: {total:,} | monte carlo error: {precision:.3g} (target {tol:g}){'' if info['converged'] else ' - budget reached'}")
+
+    return stats, info
@@ -3,6 +3,7 @@
 import os
 import pandas as pd
 from typing import Optional
+from loadCSV import get_data_dir as _getDataDir
 
 def save_to_file(
     df: pd.DataFrame,
@@ -11,16 +12,12 @@ def save_to_file(
     encoding: str = 'utf-8',
     **kwargs
 ) -> None:
-    # Get the directory where this script is located
-    scriptDir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Create path to '../data' relative to the script
-    #dataDir = os.path.join(scriptDir, '..', 'data')
-    dataDir = scriptDir # just save to same folder as script
+    # same folder loadCSV reads from (the script folder unless set_data_dir moved it)
+    dataDir = _getDataDir()
 
     # Build full file path and normalize it (also force lowercase filename)
-    filePath = os.path.join(dataDir, fileName)
-    filePath = os.path.abspath(filePath.lower())
+    filePath = os.path.join(dataDir, fileName.lower())
+    filePath = os.path.abspath(filePath)
     
     # Create the data directory if it doesn't exist
     os.makedirs(dataDir, exist_ok=True)
@@ -29,3 +26,39 @@ def save_to_file(
     df.to_csv(filePath, index=index, encoding=encoding, **kwargs)
     
     print(f'DataFrame saved to: {filePath}')
+
+
+def save_tail_to_file(df: pd.DataFrame, fileName: str, key: str = 'date', since=None, index: bool = False, encoding: str = 'utf-8') -> int:
+    # only the tail of an existing file is written: stored rows from the first new key on
+    # (since, or the last stored row) are replaced by df's, earlier lines are left untouched.
+    # df is the full, sorted series. returns the number of rows written
+    dataDir = _getDataDir()
+    filePath = os.path.abspath(os.path.join(dataDir, fileName.lower()))
+
+    if not os.path.exists(filePath) or list(pd.read_csv(filePath, nrows=0).columns) != list(df.columns):
+        save_to_file(df, fileName, index=index, encoding=encoding)
+        return len(df)
+
+    stored = pd.read_csv(filePath, usecols=[key])[key]
+    if pd.api.types.is_datetime64_any_dtype(df[key]):
+        stored = pd.to_datetime(stored)
+
+    start = stored.iloc[-1] if not stored.empty else df[key].iloc[0]
+    if since is not None:
+        start = min(start, since)
+
+    keep = int((stored < start).sum())
+    tail = df[df[key] >= start]
+
+    if keep < len(stored):
+        # cut the file after the kept rows (+ header), they are carried over as text
+        with open(filePath, encoding=encoding) as f:
+            head = [next(f) for _ in range(keep + 1)]
+        with open(filePath, 'w', encoding=encoding) as f:
+            f.writelines(head)
+
+    tail.to_csv(filePath, mode='a', header=False, index=index, encoding=encoding)
+
+    print(f'{len(tail)} row(s) written to the tail of: {filePath}')
+
+    return len(tail)
@@ -1,20 +1,25 @@
 # sortPriceChange.py
 
+import pandas as pd
 from loadCSV import load_from_file as _load
 from saveCSV import save_to_file as _save
 
 
-def sort_price_change(asset1: str, asset2: str) -> None:
+def sort_price_change(asset1: str, asset2: str, df: pd.DataFrame = None, save: bool = True) -> pd.DataFrame:
     print('')
     print(' --- sorting price change --- ')
     
-    df = _load(f'{asset1}_{asset2}_price_change.csv', ['date', 'ratio', 'change_pct'])
+    if df is None:
+        df = _load(f'{asset1}_{asset2}_price_change.csv', ['date', 'ratio', 'change_pct'])
 
     print(f'sorting {len(df)} rows..')
 
     df_sorted = df.sort_values(by='change_pct', ascending=True)
-  
-    _save(df_sorted, f'{asset1}_{asset2}_price_change_ordered.csv')
+
+    if save:
+        _save(df_sorted, f'{asset1}_{asset2}_price_change_ordered.csv')
+
+    return df_sorted
 
 
 if __name__ == '__main__':
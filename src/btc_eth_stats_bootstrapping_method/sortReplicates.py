@@ -1,14 +1,19 @@
 # sortReplicates.py
 
-from loadCSV import load_from_file as _load
+import pandas as pd
 from saveCSV import save_to_file as _save
+from replicateStore import ReplicateStore
 
 
-def sort_reps(asset1: str, asset2: str) -> None:
+def sort_reps(asset1: str, asset2: str, store: ReplicateStore = None, save: bool = True) -> pd.DataFrame:
     print('')
     print(' --- sorting replicates --- ')
 
-    df = _load(f'{asset1}_{asset2}_replicates.csv', ['replicate_index', 'block_index', 'date', f'{asset1}_{asset2}_price', 'change_pct'])
+    if store is None:
+        store = ReplicateStore.load(f'{asset1}_{asset2}_replicates.npz')
+
+    # materialize the replicate rows from the stored block starts
+    df = store.to_frame(f'{asset1}_{asset2}_price')
 
     # sort each replicate by change_pct
     df_sorted = df.sort_values(by=['replicate_index', 'change_pct'], ascending=[True, True])
@@ -21,8 +26,11 @@ def sort_reps(asset1: str, asset2: str) -> None:
 
     print(f"total rows: {len(df_sorted)}")
     print(f"unique replicates: {df_sorted['replicate_index'].nunique()}")
-    
-    _save(df_sorted, f'{asset1}_{asset2}_replicates_ordered.csv')
+
+    if save:
+        _save(df_sorted, f'{asset1}_{asset2}_replicates_ordered.csv')
+
+    return df_sorted
 
 
 if __name__ == "__main__":
@@ -5,11 +5,12 @@ from loadCSV import load_from_file as _load
 from saveCSV import save_to_file as _save
 
 
-def sort_upper_lower(asset1: str, asset2: str) -> None:
+def sort_upper_lower(asset1: str, asset2: str, df: pd.DataFrame = None, save: bool = True) -> tuple[pd.DataFrame, pd.DataFrame]:
     print('')
     print(' --- sorting upper lower results --- ')
 
-    df = _load(f'{asset1}_{asset2}_upper_lower_summary.csv', ['replicate_index', 'lower_5th_pct', 'upper_95th_pct'])
+    if df is None:
+        df = _load(f'{asset1}_{asset2}_upper_lower_summary.csv', ['replicate_index', 'lower_5th_pct', 'upper_95th_pct'])
 
     # sort lower
     df_lower = (
@@ -21,8 +22,9 @@ def sort_upper_lower(asset1: str, asset2: str) -> None:
     print('')
     print(df_lower)
 
-    print('')
-    _save(df_lower, f'{asset1}_{asset2}_lower_ordered.csv')
+    if save:
+        print('')
+        _save(df_lower, f'{asset1}_{asset2}_lower_ordered.csv')
 
     # sort upper
     df_upper = (
@@ -34,8 +36,11 @@ def sort_upper_lower(asset1: str, asset2: str) -> None:
     print('')
     print(df_upper)
 
-    print('')
-    _save(df_upper, f'{asset1}_{asset2}_upper_ordered.csv')
+    if save:
+        print('')
+        _save(df_upper, f'{asset1}_{asset2}_upper_ordered.csv')
+
+    return df_lower, df_upper
 
 
 if __name__ == '__main__':
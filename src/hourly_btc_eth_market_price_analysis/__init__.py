@@ -0,0 +1,6 @@
+"""BTC/ETH ratio at the 10am / 10pm KST anchors.
+
+Every module is run from src as part of the package (python -m hourly_btc_eth_market_price_analysis.<module>),
+so the shared resampling kernels in btc_eth_stats_bootstrapping_method import the same way. Each entry point
+reads and writes next to its own file.
+"""
@@ -0,0 +1,185 @@
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from numpy.lib.stride_tricks import sliding_window_view
+import warnings
+import os
+
+
+class AnchorHourMatrix:
+    """
+    BTC/ETH ratio change for EVERY start hour → end hour pair (24 × 24, KST)
+    • built from the raw hourly store written by CryptoPriceDownloader (Open price, like the 10am/10pm file)
+    • start hour s, end hour e → horizon (e - s) mod 24 hours, e == s means the same hour next day
+    • horizons that cross midnight simply run into the next KST day
+    • Relative change = (End_ratio - Start_ratio) / Start_ratio   ← decimal form (NOT %)
+
+    Output cube: (stat × start hour × end hour) with stats
+    mean, std, count, positive share and the requested percentiles
+    """
+
+    KST_OFFSET_HOURS = 9
+
+    def __init__(self, btc_file='btc_usd_hourly_raw.csv', eth_file='eth_usd_hourly_raw.csv', percentiles=(5, 25, 50, 75, 95)):
+        self.btc_file = btc_file
+        self.eth_file = eth_file
+        self.percentiles = list(percentiles)
+        self.stat_names = ['mean', 'std', 'count', 'positive_share'] + [f'p{p:g}' for p in self.percentiles]
+
+        self.output_file = 'btc_eth_anchor_hour_cube.npz'
+        self.summary_file = 'btc_eth_anchor_hour_summary.csv'
+        self.heatmap_file = 'btc_eth_anchor_hour_heatmaps.png'
+
+        self.cube = None
+
+    def load_raw(self, path):
+        """Open price per UTC hour. Prefers the columnar store next to the csv (btc_usd_hourly_raw.npz),
+        falls back to a yfinance csv (extra Ticker / Datetime header rows are dropped)."""
+        store = os.path.splitext(path)[0] + '.npz'
+        if os.path.exists(store):
+            with np.load(store) as data:
+                prices = data['Open'].astype(np.float64)
+                hours = data['time'] // 3600
+
+            print(f"✅ Loaded {len(prices):,} hourly records from {store}")
+            return pd.Series(prices, index=hours)
+
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"❌ Raw file '{path}' not found! Run marketPrice.py first.")
+
+        raw = pd.read_csv(path, index_col=0)
+        times = pd.to_datetime(raw.index, utc=True, errors='coerce', format='ISO8601')
+        keep = ~times.isna()
+
+        prices = pd.to_numeric(raw.loc[keep, 'Open'], errors='coerce').to_numpy(dtype=np.float64)
+        hours = ((times[keep] - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(hours=1)).to_numpy(dtype=np.int64)
+
+        print(f"✅ Loaded {len(prices):,} hourly records from {path}")
+        return pd.Series(prices, index=hours)
+
+    def load_log_ratio(self):
+        """log(BTC/ETH) on a gap-free hourly grid from 00:00 KST to one day past the last full day (missing hours are NaN)."""
+        btc = self.load_raw(self.btc_file)
+        eth = self.load_raw(self.eth_file)
+
+        ratio = (btc / eth).dropna()
+        ratio = ratio[~ratio.index.duplicated(keep='last')]
+        if ratio.empty:
+            raise ValueError("❌ No overlapping BTC/ETH hours")
+
+        # first 00:00 KST at or before the first hour, so row k of the grid is KST hour k % 24
+        first = ratio.index.min()
+        first -= (first + self.KST_OFFSET_HOURS) % 24
+        n_days = (ratio.index.max() - first) // 24 + 1
+        grid = np.full((n_days + 1) * 24, np.nan)
+        grid[ratio.index - first] = np.log(ratio.to_numpy())
+
+        self.first_hour = first
+        return grid
+
+    def build_cube(self):
+        log_ratio = self.load_log_ratio()
+
+        # windows of 25 hours starting at every hour, viewed as (day × start hour × offset 0..24).
+        # the grid ends with a padding day, so every start hour with data gets a window
+        n_days = len(log_ratio) // 24 - 1
+        if n_days < 2:
+            raise ValueError("❌ Need at least two full days of hourly data")
+
+        windows = sliding_window_view(log_ratio, 25)[:n_days * 24].reshape(n_days, 24, 25)
+
+        # (day × start × end): end hour e sits (e - s) mod 24 hours after s, 0 → 24
+        start = np.arange(24)[:, None]
+        horizon = (np.arange(24)[None, :] - start - 1) % 24 + 1
+        changes = np.expm1(windows[:, start, horizon] - windows[:, :, :1])
+
+        valid = ~np.isnan(changes)
+        count = valid.sum(axis=0)
+
+        # pairs without any complete day stay NaN
+        with np.errstate(invalid='ignore', divide='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            stats_cube = [
+                np.nanmean(changes, axis=0),
+                np.nanstd(changes, axis=0, ddof=1),
+                count.astype(np.float64),
+                np.where(count > 0, (changes > 0).sum(axis=0) / count, np.nan)
+            ]
+            stats_cube.extend(np.nanpercentile(changes, self.percentiles, axis=0))
+
+        self.cube = np.stack(stats_cube)
+        self.n_days = n_days
+
+        first_kst = pd.Timestamp(self.first_hour * 3600, unit='s', tz='UTC').tz_convert('Asia/Seoul')
+        print(f"Period     : {first_kst.date()} → {(first_kst + pd.Timedelta(days=n_days - 1)).date()} ({n_days:,} start days)")
+        return self.cube
+
+    def stat(self, name):
+        """(start hour × end hour) slice of one statistic."""
+        return self.cube[self.stat_names.index(name)]
+
+    def summary(self):
+        """Long form: one row per start/end pair, one column per statistic."""
+        start, end = np.meshgrid(np.arange(24), np.arange(24), indexing='ij')
+        df = pd.DataFrame({'start_hour_kst': start.ravel(), 'end_hour_kst': end.ravel(),
+                           'horizon_hours': ((end - start - 1) % 24 + 1).ravel()})
+        for k, name in enumerate(self.stat_names):
+            df[name] = self.cube[k].ravel()
+        return df
+
+    def print_top_pairs(self, n=10):
+        df = self.summary()
+        print(f"\n=== TOP {n} START/END PAIRS BY |MEAN| (KST) ===")
+        print("-" * 60)
+        top = df.reindex(df['mean'].abs().sort_values(ascending=False).index).head(n)
+        print(top[['start_hour_kst', 'end_hour_kst', 'horizon_hours', 'mean', 'std', 'positive_share', 'count']].to_string(index=False))
+
+    def plot_heatmaps(self, names=('mean', 'std', 'positive_share', 'p5', 'p95')):
+        names = [name for name in names if name in self.stat_names]
+        fig, axes = plt.subplots(1, len(names), figsize=(6 * len(names), 5.5))
+        axes = np.atleast_1d(axes)
+
+        for ax, name in zip(axes, names):
+            values = self.stat(name) * (1 if name == 'count' else 100)
+
+            # signed stats diverge around 0, the positive share around 50%
+            if name == 'positive_share':
+                limit = np.nanmax(np.abs(values - 50))
+                image = ax.imshow(values, cmap='RdBu', vmin=50 - limit, vmax=50 + limit)
+            elif name == 'mean' or name.startswith('p'):
+                limit = np.nanmax(np.abs(values))
+                image = ax.imshow(values, cmap='RdBu', vmin=-limit, vmax=limit)
+            else:
+                image = ax.imshow(values, cmap='viridis')
+
+            ax.set_title(name if name == 'count' else f'{name} (%)')
+            ax.set_xlabel('end hour (KST)')
+            ax.set_ylabel('start hour (KST)')
+            ax.set_xticks(range(0, 24, 2))
+            ax.set_yticks(range(0, 24, 2))
+            fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+
+        fig.suptitle(f'BTC/ETH ratio change by start → end hour (KST) | {self.n_days:,} days', fontsize=14)
+        fig.tight_layout()
+        fig.savefig(self.heatmap_file, dpi=120, bbox_inches='tight')
+        plt.close(fig)
+        print(f"📊 Heatmaps saved → {self.heatmap_file}")
+
+    def save(self):
+        np.savez_compressed(self.output_file, cube=self.cube, stats=np.array(self.stat_names),
+                            first_hour_utc=np.int64(self.first_hour), n_days=np.int64(self.n_days))
+        self.summary().to_csv(self.summary_file, index=False, float_format='%.10f')
+        print(f"💾 Cube saved → {self.output_file} | summary → {self.summary_file}")
+
+    def run(self):
+        self.build_cube()
+        self.print_top_pairs()
+        self.plot_heatmaps()
+        self.save()
+        return self.cube
+
+
+if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    AnchorHourMatrix().run()
@@ -1,25 +1,87 @@
 import yfinance as yf
+import numpy as np
 import pandas as pd
 import pytz
+import os
 
 
 class CryptoPriceDownloader:
-    """Downloads BTC & ETH hourly data, extracts exact 10:00 / 22:00 KST prices."""
+    """Downloads BTC & ETH hourly data, extracts exact 10:00 / 22:00 KST prices.
+    Raw hours are kept in a columnar store (btc/eth_usd_hourly_raw.npz), every run only
+    downloads the hours after the last stored one and updates the KST file from there."""
+
+    RAW_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    # yfinance only serves hourly bars for the last 730 days
+    MAX_HOURLY_DAYS = 729
 
     def __init__(self):
         self.kst_tz = pytz.timezone('Asia/Seoul')
         self.start_date = '2024-02-26'
         
         self.output_file = 'btc_eth_prices_kst_10am_10pm_2years.csv'
-        self.btc_raw_file = 'btc_usd_hourly_raw.csv'
-        self.eth_raw_file = 'eth_usd_hourly_raw.csv'
+        self.btc_raw_file = 'btc_usd_hourly_raw.npz'
+        self.eth_raw_file = 'eth_usd_hourly_raw.npz'
+
+    def _load_store(self, path):
+        """Stored hours as a UTC-indexed frame with the yfinance price columns (empty if no store yet)."""
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=self.RAW_COLUMNS, index=pd.DatetimeIndex([], tz='UTC'), dtype=np.float64)
+
+        with np.load(path) as data:
+            index = pd.to_datetime(data['time'], unit='s', utc=True)
+            return pd.DataFrame({col: data[col] for col in self.RAW_COLUMNS}, index=index)
+
+    def _save_store(self, path, df):
+        times = ((df.index - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)).to_numpy(dtype=np.int64)
+        np.savez(path, time=times, **{col: df[col].to_numpy(dtype=np.float64) for col in self.RAW_COLUMNS})
+
+    def _flatten(self, df):
+        """yfinance frame → UTC index and flat Open/High/Low/Close/Volume columns."""
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        if df.index.tz is None:
+            df.index = pd.to_datetime(df.index).tz_localize('UTC')
+        df.index = df.index.tz_convert('UTC')
+        return df[self.RAW_COLUMNS].astype(np.float64)
+
+    def _update_store(self, ticker, path):
+        """Download from the last stored hour on (it may have been partial) and append to the store.
+        Returns the full store and the first hour that was (re)written."""
+        stored = self._load_store(path)
+
+        earliest = pd.Timestamp.now(tz='UTC').floor('h') - pd.Timedelta(days=self.MAX_HOURLY_DAYS)
+        if stored.empty:
+            start = max(pd.Timestamp(self.start_date, tz='UTC'), earliest)
+        else:
+            start = max(stored.index[-1], earliest)
+
+        print(f"   • {ticker}: {len(stored):,} stored hours, downloading from {start:%Y-%m-%d %H:%M} UTC")
+        new = yf.download(ticker, start=start.strftime('%Y-%m-%d'), interval='1h', progress=False)
+
+        if new.empty:
+            return stored, None
+
+        new = self._flatten(new)
+        new = new[new.index >= start]
+
+        merged = pd.concat([stored, new])
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        self._save_store(path, merged)
+        print(f"   • {ticker}: +{len(merged) - len(stored):,} new hours → {path}")
+
+        return merged, new.index.min()
 
     def _download_data(self):
         print('')
-        print("Downloading hourly BTC-USD & ETH-USD data...")
-        btc_data = yf.download('BTC-USD', start=self.start_date, interval='1h', progress=False)
-        eth_data = yf.download('ETH-USD', start=self.start_date, interval='1h', progress=False)
-        return btc_data, eth_data
+        print("Updating hourly BTC-USD & ETH-USD data...")
+        btc_data, btc_from = self._update_store('BTC-USD', self.btc_raw_file)
+        eth_data, eth_from = self._update_store('ETH-USD', self.eth_raw_file)
+
+        # anchors from the earliest rewritten hour of either asset on
+        changed = [ts for ts in (btc_from, eth_from) if ts is not None]
+        since = min(changed) if changed else None
+        return btc_data, eth_data, since
 
     def _extract_kst_prices(self, df, asset):
         """Extract rows that fall exactly on 10:00 and 22:00 KST."""
@@ -51,24 +113,7 @@ class CryptoPriceDownloader:
 
         return filtered[['KST_Datetime', 'Time_of_Day', 'Price', 'High', 'Low', 'Close', 'Volume']]
 
-    def run(self):
-        """Run the full pipeline."""
-        btc_data, eth_data = self._download_data()
-
-        # Save raw data
-        print("\n💾 Saving raw hourly data...")
-        btc_data.to_csv(self.btc_raw_file)
-        eth_data.to_csv(self.eth_raw_file)
-        print(f"   • Raw BTC-USD saved → {self.btc_raw_file}")
-        print(f"   • Raw ETH-USD saved → {self.eth_raw_file}")
-
-        btc_prices = self._extract_kst_prices(btc_data, 'BTC')
-        eth_prices = self._extract_kst_prices(eth_data, 'ETH')
-
-        if btc_prices.empty and eth_prices.empty:
-            print("❌ Still no data. Try again in a few minutes.")
-            return
-
+    def _combine(self, btc_prices, eth_prices):
         # Prepare subsets (extra safety)
         btc_subset = btc_prices[['KST_Datetime', 'Time_of_Day', 'Price']].rename(columns={'Price': 'BTC_Price'}).copy()
         eth_subset = eth_prices[['KST_Datetime', 'Price']].rename(columns={'Price': 'ETH_Price'}).copy()
@@ -79,22 +124,63 @@ class CryptoPriceDownloader:
                 df.columns = df.columns.get_level_values(0)
 
         # Merge
-        combined = pd.merge(
+        return pd.merge(
             btc_subset,
             eth_subset,
             on='KST_Datetime',
             how='outer'
         ).sort_values('KST_Datetime').reset_index(drop=True)
 
-        print(f"\n✅ Success! Total data points: {len(combined):,}")
+    def _update_anchor_file(self, combined):
+        """Replace the rows from the first new anchor on and append the rest, earlier rows are left as they are."""
+        if not os.path.exists(self.output_file):
+            combined.to_csv(self.output_file, index=False)
+            return len(combined)
+
+        existing = pd.read_csv(self.output_file, usecols=['KST_Datetime'])
+        first_new = combined['KST_Datetime'].iloc[0]
+        keep = int((existing['KST_Datetime'] < first_new).sum())
+
+        if keep == len(existing):
+            # nothing to replace, append only
+            combined.to_csv(self.output_file, mode='a', header=False, index=False)
+        else:
+            # the last stored anchors were refreshed (e.g. a price that was still missing)
+            # earlier rows are carried over as text, so they are written back unchanged
+            kept = pd.read_csv(self.output_file, nrows=keep, dtype=str, keep_default_na=False)
+            pd.concat([kept, combined], ignore_index=True).to_csv(self.output_file, index=False)
+
+        return keep + len(combined)
+
+    def run(self):
+        """Run the full pipeline."""
+        btc_data, eth_data, since = self._download_data()
+
+        if since is None:
+            print("❌ No new data. Try again in a few minutes.")
+            return
+
+        # only the hours that were (re)downloaded are re-extracted
+        btc_prices = self._extract_kst_prices(btc_data[btc_data.index >= since].copy(), 'BTC')
+        eth_prices = self._extract_kst_prices(eth_data[eth_data.index >= since].copy(), 'ETH')
+
+        if btc_prices.empty and eth_prices.empty:
+            print("⚠️ No new 10:00 / 22:00 KST hours yet.")
+            return
+
+        combined = self._combine(btc_prices, eth_prices)
+        total = self._update_anchor_file(combined)
+
+        print(f"\n✅ Success! {len(combined):,} new/updated data points, {total:,} in total")
         print("Columns:", combined.columns.tolist())
         print("\nLast 5 rows:")
         print(combined.tail(5).to_string(index=False))
 
-        combined.to_csv(self.output_file, index=False)
-        print(f"\n💾 Clean CSV saved to: {self.output_file}")
+        print(f"\n💾 Clean CSV updated: {self.output_file}")
 
 
 if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
     downloader = CryptoPriceDownloader()
     downloader.run()
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import os
+
+
+class PairedDataProcessor:
+    """
+    Shared base of DayDataProcessor / NightDataProcessor
+    • loads the 10am / 10pm KST price file (ratio column added)
+    • (date × slot) row positions, KST formatting and the paired output layout
+    Subclasses only decide which record is paired with which.
+    """
+
+    def __init__(self, input_file='btc_eth_prices_kst_10am_10pm_2years.csv', output_file=None):
+        self.input_file = input_file
+        self.output_file = output_file
+
+    def load_data(self):
+        if not os.path.exists(self.input_file):
+            raise FileNotFoundError(f"❌ Input file '{self.input_file}' not found!")
+
+        df = pd.read_csv(self.input_file)
+        print(f"✅ Loaded {len(df):,} records from {self.input_file}")
+
+        df['KST_Datetime'] = pd.to_datetime(
+            df['KST_Datetime'].str.replace(' KST', '', regex=False),
+            format='%Y-%m-%d %H:%M'
+        )
+        df['Date'] = df['KST_Datetime'].dt.date
+        df['BTC_Price'] = pd.to_numeric(df['BTC_Price'], errors='coerce')
+        df['ETH_Price'] = pd.to_numeric(df['ETH_Price'], errors='coerce')
+        df['BTC_ETH_Ratio'] = df['BTC_Price'] / df['ETH_Price']
+
+        return df.sort_values('KST_Datetime').reset_index(drop=True)
+
+    def pivot_slots(self, df):
+        # (date x slot) row positions in one pivot, slot 0 = first record of the date, slot 1 = second.
+        # a date with a single record gets -1 in slot 1
+        slots = df.assign(Slot=df.groupby('Date').cumcount(), Row=np.arange(len(df)))
+        slots = slots[slots['Slot'] < 2].pivot(index='Date', columns='Slot', values='Row').reindex(columns=[0, 1])
+
+        return slots.fillna(-1).to_numpy(dtype=np.int64).T
+
+    def format_kst(self, times):
+        # '%Y-%m-%d %H:%M KST' for a whole column at once (strftime with a literal suffix is per element)
+        text = np.datetime_as_string(times.to_numpy(dtype='datetime64[m]'), unit='m')
+        return np.char.add(np.char.replace(text, 'T', ' '), ' KST')
+
+    def pair_rows(self, start, end):
+        # start and end records side by side, one output row per pair
+        start_ratio = start['BTC_ETH_Ratio'].to_numpy(dtype=np.float64)
+        end_ratio = end['BTC_ETH_Ratio'].to_numpy(dtype=np.float64)
+
+        ratio_diff = end_ratio - start_ratio
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio_rel_change = np.where(start_ratio != 0, ratio_diff / start_ratio, 0.0)
+
+        columns = ['KST_Datetime','Time_of_Day','BTC_Price','ETH_Price','BTC_ETH_Ratio',
+                   'KST_Datetime','Time_of_Day','BTC_Price','ETH_Price','BTC_ETH_Ratio',
+                   'Ratio_Difference','Ratio_Relative_Change']
+
+        data = [
+            self.format_kst(start['KST_Datetime']), start['Time_of_Day'], start['BTC_Price'], start['ETH_Price'], np.round(start_ratio, 10),
+            self.format_kst(end['KST_Datetime']), end['Time_of_Day'], end['BTC_Price'], end['ETH_Price'], np.round(end_ratio, 10),
+            ratio_diff, ratio_rel_change
+        ]
+
+        result_df = pd.DataFrame({i: np.asarray(col) for i, col in enumerate(data)})
+        result_df.columns = columns
+        return result_df
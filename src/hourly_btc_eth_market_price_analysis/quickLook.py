@@ -1,5 +1,6 @@
 import pandas as pd
 import sys
+import os
 
 class RatioQuickLook:
     """
@@ -100,6 +101,8 @@ class RatioQuickLook:
 
 
 if __name__ == "__main__":
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
     # ==============================================
     # You can choose here OR use command line!
     # ==============================================
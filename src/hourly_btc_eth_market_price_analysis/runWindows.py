@@ -0,0 +1,150 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# scipy / seaborn / matplotlib come in with statsLook. a fork worker inherits them, a spawn / forkserver
+# worker imports them again, once: the same pool runs every window and every chart
+from hourly_btc_eth_market_price_analysis.statsLook import RatioAnalyzer
+from btc_eth_stats_bootstrapping_method.renderGraphs import use_headless
+
+
+class WindowRunner:
+    """
+    Several BTC/ETH ratio windows in ONE process tree instead of one statsLook.py run each
+    • a window is 'day', 'night' or any paired file from dayData / nightData (path[:day|night])
+    • every input is loaded once, in the parent, before any worker starts
+    • one warm worker pool: each window's sweep statistics run as one task, then every chart of
+      every window as its own task, so total wall time approaches the slowest single window
+    • one combined summary: ratio_windows_summary.json
+
+    Run from src (paired files are read next to this file):
+               python -m hourly_btc_eth_market_price_analysis.runWindows day night
+               python -m hourly_btc_eth_market_price_analysis.runWindows day night my_pairs.csv:night --percentiles 85 90 95
+    """
+
+    def __init__(self, windows=('day', 'night'), percentiles=(85, 90, 95), bootstrap_method='moving', block_size=21, workers=None):
+        self.windows = list(windows)
+        self.percentiles = list(percentiles)
+        self.bootstrap_method = bootstrap_method
+        self.block_size = block_size
+        self.workers = workers
+
+        self.summary_file = 'ratio_windows_summary.json'
+        self.analyzers = []
+
+    @staticmethod
+    def parse_window(window):
+        """'day' / 'night' → (mode, None), 'my_pairs.csv:night' → ('night', 'my_pairs.csv'), a bare path → ('day', path)."""
+        if window.lower() in ('day', 'night'):
+            return window.lower(), None
+
+        path, sep, mode = window.rpartition(':')
+        if sep and mode.lower() in ('day', 'night'):
+            return mode.lower(), path
+
+        return 'day', window
+
+    def load(self):
+        for window in self.windows:
+            mode, csv_path = self.parse_window(window)
+            self.analyzers.append(RatioAnalyzer(mode=mode, bootstrap_method=self.bootstrap_method,
+                                                block_size=self.block_size, csv_path=csv_path))
+
+        names = [analyzer.name for analyzer in self.analyzers]
+        if len(set(names)) != len(names):
+            raise ValueError(f"❌ Windows would overwrite each other's outputs: {names}")
+
+        return self.analyzers
+
+    @staticmethod
+    def _run_window(analyzer, percentiles):
+        # one window's statistics in a worker: the analyzer comes back with its joint bootstrap for the charts,
+        # its report is captured and printed by the parent in window order
+        log = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            results = analyzer.sweep_results(percentiles)
+
+        return analyzer, results, log.getvalue(), time.perf_counter() - start
+
+    @staticmethod
+    def _draw_chart(analyzer, percentile):
+        log = io.StringIO()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(log):
+            png_filename = analyzer.draw_percentile(percentile)
+
+        return png_filename, log.getvalue(), time.perf_counter() - start
+
+    def run(self):
+        start = time.perf_counter()
+        if not self.analyzers:
+            self.load()
+
+        print(f"\n🚀 Running {len(self.analyzers)} windows concurrently: {', '.join(a.name for a in self.analyzers)}")
+
+        workers = self.workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers, initializer=use_headless) as pool:
+            futures = {pool.submit(self._run_window, analyzer, self.percentiles): k for k, analyzer in enumerate(self.analyzers)}
+            windows = [None] * len(self.analyzers)
+            charts = [None] * len(self.analyzers)
+
+            # a window's charts go to the same pool as soon as its statistics are back
+            for future in as_completed(futures):
+                k = futures[future]
+                windows[k] = future.result()
+                analyzer, results, _, _ = windows[k]
+                charts[k] = [pool.submit(self._draw_chart, analyzer, result['percentile']) for result in results]
+
+            charts = [[future.result() for future in futures] for futures in charts]
+
+        summaries = []
+        for (analyzer, results, log, seconds), drawn in zip(windows, charts):
+            print("\n" + "#" * 70)
+            print(f"# {analyzer.name.upper()} ({analyzer.csv_path})")
+            print("#" * 70)
+            print(log, end='')
+            print(f"\n🎨 Rendered {len(drawn)} charts...")
+            for _, chart_log, _ in drawn:
+                print(chart_log, end='')
+
+            summary = analyzer.save_sweep(results, [png_filename for png_filename, _, _ in drawn])
+            summary['seconds'] = seconds + sum(chart_seconds for _, _, chart_seconds in drawn)
+            summaries.append(summary)
+
+        wall = time.perf_counter() - start
+        print(f"\n⏱️  Wall time {wall:.1f}s | slowest window {max(s['seconds'] for s in summaries):.1f}s")
+
+        with open(self.summary_file, 'w', encoding='utf-8') as f:
+            json.dump({'wall_seconds': wall, 'windows': summaries}, f, indent=2)
+        print(f"💾 Combined summary saved → {self.summary_file}")
+
+        return summaries
+
+
+# ====================== ENTRY POINT ======================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='run the BTC/ETH ratio analysis for several windows at once')
+    parser.add_argument('windows', nargs='*', default=['day', 'night'], help="day, night or a paired csv (path[:day|night])")
+    parser.add_argument('--percentiles', type=float, nargs='+', default=[85, 90, 95])
+    parser.add_argument('--method', default='moving', help='moving / circular / stationary')
+    parser.add_argument('--block-size', default='21', help="a number or 'auto' (Politis-White)")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    block_size = args.block_size if args.block_size.lower() == 'auto' else int(args.block_size)
+
+    # custom paired files are given relative to where the command runs,
+    # day / night files and every output sit next to the script
+    windows = []
+    for window in args.windows:
+        mode, csv_path = WindowRunner.parse_window(window)
+        windows.append(mode if csv_path is None else f'{os.path.abspath(csv_path)}:{mode}')
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    WindowRunner(windows, args.percentiles, args.method, block_size, args.workers).run()
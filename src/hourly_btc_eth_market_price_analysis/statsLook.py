@@ -4,19 +4,44 @@ from scipy import stats
 import matplotlib.pyplot as plt
 import seaborn as sns
 import sys
+import os
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from btc_eth_stats_bootstrapping_method.resampling import check_method, resolve_block_size, block_bootstrap, run_until_converged
+from btc_eth_stats_bootstrapping_method.renderGraphs import use_headless
 
 
 class RatioAnalyzer:
     """Unified BTC/ETH ratio analyzer for BOTH day (10am→10pm) and night (10pm→10am next day).
-    Run with:  python statsLook.py          # day mode (default)
-               python statsLook.py night    # night mode
-               python statsLook.py day      # explicit day"""
-
-    def __init__(self, mode: str = 'day'):
+    Run from src (reads and writes next to this file):
+               python -m hourly_btc_eth_market_price_analysis.statsLook                    # day mode (default)
+               python -m hourly_btc_eth_market_price_analysis.statsLook night              # night mode
+               python -m hourly_btc_eth_market_price_analysis.statsLook day                # explicit day
+               python -m hourly_btc_eth_market_price_analysis.statsLook night stationary   # pick the bootstrap: moving / circular / stationary
+               python -m hourly_btc_eth_market_price_analysis.statsLook day circular auto  # block size: a number or 'auto' (Politis-White)
+               python -m hourly_btc_eth_market_price_analysis.statsLook day --sweep 85 90 95  # no prompt: every percentile from one bootstrap, PNGs + json summary
+    Any paired file from dayData / nightData layout: RatioAnalyzer('night', csv_path='my_pairs.csv'),
+    outputs are then named after the file (ratio_my_pairs_analysis_90.png). Several windows at once → runWindows.py"""
+
+    def __init__(self, mode: str = 'day', bootstrap_method: str = 'moving', block_size=21, tol: float = None, max_boot: int = 100_000, percentiles=tuple(range(80, 100)), csv_path: str = None, name: str = None):
         self.mode = mode.lower().strip()
         if self.mode not in ['day', 'night']:
             raise ValueError("❌ mode must be 'day' or 'night'")
 
+        self.bootstrap_method = check_method(bootstrap_method)
+        self.rng = np.random.default_rng(42)
+
+        # tol (relative-change units) switches the bootstraps from a fixed resample count
+        # to batches until the monte carlo error of the estimate and its CI is below tol
+        self.tol = tol
+        self.max_boot = max_boot
+
+        # every bootstrapped statistic comes from one shared set of resamples (see joint_bootstrap)
+        self.joint_percentiles = list(percentiles)
+        self.joint_columns = ['mean', 't_stat', 'positive_share'] + [f'p{p:g}' for p in self.joint_percentiles]
+        self.boot_stats = None
+
         if self.mode == 'night':
             self.csv_path = 'btc_eth_night_paired.csv'
             self.title_prefix = "NIGHTLY"
@@ -32,7 +57,13 @@ class RatioAnalyzer:
             self.unit = "day"
             self.unit_plural = "days"
 
+        # a custom paired file keeps the mode's wording, its outputs are named after the file
+        if csv_path is not None:
+            self.csv_path = csv_path
+        self.name = name or (self.mode if csv_path is None else os.path.splitext(os.path.basename(csv_path))[0])
+
         self._load_and_clean_data()
+        self.block_size = resolve_block_size(self.changes_np, block_size, self.bootstrap_method)
 
     def _load_and_clean_data(self):
         df = pd.read_csv(self.csv_path)
@@ -86,8 +117,8 @@ class RatioAnalyzer:
         monthly_display['mean'] = monthly_display['mean'] * 100
 
         print(monthly_display.round(4))
-        monthly_display.to_csv(f'ratio_monthly_blocks_{self.mode}.csv')
-        print(f"\n📁 Monthly blocks saved → ratio_monthly_blocks_{self.mode}.csv")
+        monthly_display.to_csv(f'ratio_monthly_blocks_{self.name}.csv')
+        print(f"\n📁 Monthly blocks saved → ratio_monthly_blocks_{self.name}.csv")
 
     # ====================== 4. ROLLING 30-DAY BLOCKS ======================
     def rolling_30day_blocks(self):
@@ -104,31 +135,67 @@ class RatioAnalyzer:
         print(f"=== BLOCK BOOTSTRAP ANALYSIS ({self.title_prefix}) ===")
         print("="*70)
 
-        print(f"Using {len(self.changes_np):,} {self.unit_plural} | Block size = 21 {self.unit}s")
+        print(f"Using {len(self.changes_np):,} {self.unit_plural} | {self.bootstrap_method.capitalize()} blocks | Block size = {self.block_size:g} {self.unit}s")
 
-        np.random.seed(42)
-        boot_means = self._moving_block_bootstrap(self.changes_np, block_size=21, n_boot=5000)
+        boot = self.joint_bootstrap()
+        boot_means = boot['mean'].to_numpy()
 
         mean_boot = boot_means.mean()
         ci95_mean = np.percentile(boot_means, [2.5, 97.5])
         p_boot = np.mean(np.abs(boot_means) >= np.abs(self.changes_np.mean())) * 2
 
+        n = len(self.changes_np)
+        t_orig = self.changes_np.mean() / (self.changes_np.std(ddof=1) / np.sqrt(n))
+        ci95_t = np.percentile(boot['t_stat'], [2.5, 97.5])
+        ci95_pos = np.percentile(boot['positive_share'], [2.5, 97.5])
+
         print(f"\nOverall mean relative change")
         print(f"   Original : {self.changes_np.mean():+.6f} ({self.changes_np.mean()*100:+.3f}%)")
         print(f"   Bootstrap mean : {mean_boot:+.6f}")
         print(f"   95% CI         : [{ci95_mean[0]:+.6f}, {ci95_mean[1]:+.6f}]")
         print(f"   Bootstrapped p-value (mean=0) : {p_boot:.4f} → {'Significant' if p_boot <= 0.05 else 'Not significant'}")
+        print(f"\nT-stat (mean / standard error)")
+        print(f"   Original : {t_orig:+.3f} | 95% CI : [{ci95_t[0]:+.3f}, {ci95_t[1]:+.3f}]")
+        print(f"Positive {self.unit_plural}")
+        print(f"   Original : {(self.changes_np > 0).mean()*100:.2f}% | 95% CI : [{ci95_pos[0]*100:.2f}%, {ci95_pos[1]*100:.2f}%]")
+
+    def joint_bootstrap(self, n_boot=5000):
+        """One resampling pass for every bootstrapped statistic: mean, t-stat, positive share and the
+        |change| percentiles. Drawn once and cached, so each extra statistic costs no extra bootstrap."""
+        if self.boot_stats is None:
+            # tol is in relative-change units → hold the mean and the percentiles to it, not t-stat / share
+            track = [0] + list(range(3, len(self.joint_columns)))
+            stats = self._run_bootstrap(self._joint_bootstrap, self.changes_np, n_boot=n_boot,
+                                        track=track, percentiles=self.joint_percentiles)
+            self.boot_stats = pd.DataFrame(stats, columns=self.joint_columns)
+
+        return self.boot_stats
 
     @staticmethod
-    def _moving_block_bootstrap(series, block_size=21, n_boot=5000):
+    def _joint_bootstrap(series, percentiles, block_size=21, n_boot=5000, method='moving', rng=None):
         n = len(series)
-        boot_means = np.empty(n_boot)
-        n_blocks = int(np.ceil(n / block_size))
-        for i in range(n_boot):
-            starts = np.random.randint(0, n - block_size + 1, size=n_blocks)
-            sample = np.concatenate([series[s:s+block_size] for s in starts])[:n]
-            boot_means[i] = sample.mean()
-        return boot_means
+
+        # (chunk × resampled values) → (chunk × [mean, t-stat, positive share, percentiles...])
+        def statistic(sample):
+            mean = sample.mean(axis=1)
+            t_stat = mean / (sample.std(axis=1, ddof=1) / np.sqrt(n))
+            positive_share = (sample > 0).mean(axis=1)
+            pcts = np.percentile(np.abs(sample), percentiles, axis=1).T
+            return np.column_stack([mean, t_stat, positive_share, pcts])
+
+        return block_bootstrap(series, statistic, n_boot, block_size, method, rng)
+
+    def _run_bootstrap(self, kernel, data, n_boot, track=None, **kwargs):
+        # fixed n_boot, or batches of n_boot // 10 until converged when tol is set
+        kwargs.update(block_size=self.block_size, method=self.bootstrap_method, rng=self.rng)
+
+        if self.tol is None:
+            return kernel(data, n_boot=n_boot, **kwargs)
+
+        stats, info = run_until_converged(lambda n: kernel(data, n_boot=n, **kwargs),
+                                          self.tol, max(100, n_boot // 10), self.max_boot, track=track)
+        self.boot_info = info
+        return stats[:, 0] if stats.shape[1] == 1 else stats
 
     # ====================== 6. DYNAMIC BALANCED RANGE ======================
     def setup_dynamic_balanced_range(self):
@@ -169,6 +236,12 @@ class RatioAnalyzer:
 
         print(f"✅ Using {self.PERCENTILE}th percentile")
 
+        self.select_percentile(self.PERCENTILE)
+
+    def select_percentile(self, percentile, verbose=True):
+        """Balanced range and coverage for a percentile of |change|, without prompting."""
+        self.PERCENTILE = percentile
+
         p = np.percentile(self.abs_np, self.PERCENTILE)
         balanced_range_pct = round(p * 100, 1)
         coverage_pct = (self.abs_np <= p).mean() * 100
@@ -177,15 +250,16 @@ class RatioAnalyzer:
         self.balanced_range_pct = balanced_range_pct
         self.coverage_pct = coverage_pct
 
-        print(f"\n💡 DYNAMIC BALANCED RANGE RECOMMENDATION ({self.PERCENTILE}th percentile)")
-        print(f"   ±{balanced_range_pct}% around the {self.reference_time} KST ratio")
-        print(f"   Covers {coverage_pct:.1f}% of all {len(self.changes)} historical {self.unit_plural}")
+        if verbose:
+            print(f"\n💡 DYNAMIC BALANCED RANGE RECOMMENDATION ({self.PERCENTILE}th percentile)")
+            print(f"   ±{balanced_range_pct}% around the {self.reference_time} KST ratio")
+            print(f"   Covers {coverage_pct:.1f}% of all {len(self.changes)} historical {self.unit_plural}")
 
     # ====================== 7. BLOCK BOOTSTRAP FOR CHOSEN PERCENTILE ======================
     def block_bootstrap_percentile(self):
         print(f"\n🔬 Block-bootstrap 95% CI for your chosen {self.PERCENTILE}th percentile...")
 
-        boot_p = self._bootstrap_percentile(self.abs_np, percentile=self.PERCENTILE, n_boot=3000)
+        boot_p = self._percentile_bootstrap(self.PERCENTILE)
         ci95_p = np.percentile(boot_p, [2.5, 97.5])
 
         self.boot_percentiles = boot_p
@@ -194,16 +268,42 @@ class RatioAnalyzer:
         print(f"   Original {self.PERCENTILE}th percentile : ±{self.p*100:.1f}%")
         print(f"   Block-bootstrap 95% CI : ±[{ci95_p[0]*100:.1f}%, {ci95_p[1]*100:.1f}%]")
 
+    def percentile_cis(self):
+        """Original |change| percentile and its block-bootstrap 95% CI for every percentile of the joint pass."""
+        boot = self.joint_bootstrap()
+        columns = [f'p{p:g}' for p in self.joint_percentiles]
+        ci = np.percentile(boot[columns].to_numpy(), [2.5, 97.5], axis=0)
+
+        return pd.DataFrame({
+            'percentile': self.joint_percentiles,
+            'original': np.percentile(self.abs_np, self.joint_percentiles),
+            'ci95_lower': ci[0],
+            'ci95_upper': ci[1]
+        })
+
+    def percentile_ci_table(self):
+        boot = self.joint_bootstrap()
+        print(f"\n=== |CHANGE| PERCENTILES WITH 95% CI (one shared bootstrap, {len(boot):,} resamples) ===")
+        print("-" * 60)
+
+        table = self.percentile_cis()
+        display = table.set_index('percentile')[['original', 'ci95_lower', 'ci95_upper']] * 100
+        print(display.round(2))
+
+        table.to_csv(f'ratio_percentile_cis_{self.name}.csv', index=False)
+        print(f"\n📁 Percentile CIs saved → ratio_percentile_cis_{self.name}.csv")
+
+    def _percentile_bootstrap(self, percentile):
+        # read off the joint pass when the percentile is on its grid, a custom one gets its own bootstrap
+        column = f'p{percentile:g}'
+        if column in self.joint_columns:
+            return self.joint_bootstrap()[column].to_numpy()
+
+        return self._run_bootstrap(self._bootstrap_percentile, self.abs_np, n_boot=3000, percentile=percentile)
+
     @staticmethod
-    def _bootstrap_percentile(data, percentile, block_size=21, n_boot=3000):
-        n = len(data)
-        n_blocks = int(np.ceil(n / block_size))
-        boot_pcts = np.empty(n_boot)
-        for i in range(n_boot):
-            starts = np.random.randint(0, n - block_size + 1, size=n_blocks)
-            sample = np.concatenate([data[s:s+block_size] for s in starts])[:n]
-            boot_pcts[i] = np.percentile(np.abs(sample), percentile)
-        return boot_pcts
+    def _bootstrap_percentile(data, percentile, block_size=21, n_boot=3000, method='moving', rng=None):
+        return block_bootstrap(data, lambda sample: np.percentile(np.abs(sample), percentile, axis=1), n_boot, block_size, method, rng)
 
     # ====================== 8. VISUALS + SAVE PNG ======================
     def generate_and_save_visuals(self):
@@ -256,7 +356,7 @@ class RatioAnalyzer:
                     ha='center', va='bottom', fontsize=11, fontweight='bold',
                     bbox=dict(boxstyle="round,pad=1.0", facecolor="#E6F3FF", edgecolor="#1E88E5", linewidth=2))
 
-        png_filename = f"ratio_{self.mode}_analysis_{int(self.PERCENTILE)}.png"
+        png_filename = f"ratio_{self.name}_analysis_{self.PERCENTILE:g}.png"
         plt.savefig(png_filename,
                     dpi=120,
                     bbox_inches='tight',
@@ -264,6 +364,89 @@ class RatioAnalyzer:
         plt.close()
 
         print(f"\n📸 Chart saved → {png_filename}")
+        return png_filename
+
+    # ====================== 9. PERCENTILE SWEEP (NON-INTERACTIVE) ======================
+    def sweep(self, percentiles=(85, 90, 95), workers=None):
+        """Headless run for several percentiles at once: one load, one joint bootstrap,
+        charts rendered in parallel worker processes, one json summary."""
+        results = self.sweep_results(percentiles)
+        percentiles = [result['percentile'] for result in results]
+
+        # workers=1 renders right here
+        if workers == 1:
+            print(f"\n🎨 Rendering {len(percentiles)} charts...")
+            charts = [self.draw_percentile(percentile) for percentile in percentiles]
+        else:
+            print(f"\n🎨 Rendering {len(percentiles)} charts in parallel...")
+            with ProcessPoolExecutor(max_workers=workers, initializer=use_headless) as pool:
+                charts = list(pool.map(self.draw_percentile, percentiles))
+
+        return self.save_sweep(results, charts)
+
+    def sweep_results(self, percentiles=(85, 90, 95)):
+        """Everything in a sweep except the charts: statistics, the joint bootstrap and one result per percentile."""
+        percentiles = [int(p) if float(p).is_integer() else float(p) for p in percentiles]
+        if not all(50 < p < 100 for p in percentiles):
+            raise ValueError("❌ sweep percentiles must be between 50 and 100")
+
+        # put the swept percentiles on the joint grid before the shared pass is drawn
+        if self.boot_stats is None:
+            self.joint_percentiles = sorted(set(self.joint_percentiles) | set(percentiles))
+            self.joint_columns = ['mean', 't_stat', 'positive_share'] + [f'p{p:g}' for p in self.joint_percentiles]
+
+        self.overall_statistics()
+        self.monthly_block_analysis()
+        self.rolling_30day_blocks()
+        self.block_bootstrap_overall_mean()
+
+        results = []
+        for percentile in percentiles:
+            self.select_percentile(percentile)
+            self.block_bootstrap_percentile()
+            results.append({
+                'percentile': percentile,
+                'range_pct': self.p * 100,
+                'balanced_range_pct': self.balanced_range_pct,
+                'coverage_pct': self.coverage_pct,
+                'ci95_lower_pct': self.ci95_p[0] * 100,
+                'ci95_upper_pct': self.ci95_p[1] * 100
+            })
+
+        self.percentile_ci_table()
+
+        return results
+
+    def save_sweep(self, results, charts):
+        """Json summary of a sweep, charts are the png names in the order of results."""
+        for result, png_filename in zip(results, charts):
+            result['chart'] = png_filename
+
+        boot_means = self.boot_stats['mean'].to_numpy()
+        summary = {
+            'name': self.name,
+            'mode': self.mode,
+            'csv_path': self.csv_path,
+            'period': [str(self.df.index.min().date()), str(self.df.index.max().date())],
+            'observations': len(self.changes),
+            'bootstrap': {'method': self.bootstrap_method, 'block_size': self.block_size, 'resamples': len(self.boot_stats)},
+            'mean': {'original': float(self.changes_np.mean()), 'ci95': np.percentile(boot_means, [2.5, 97.5]).tolist()},
+            'percentiles': results
+        }
+
+        summary_file = f"ratio_{self.name}_sweep.json"
+        with open(summary_file, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Sweep summary saved → {summary_file}")
+
+        return summary
+
+    def draw_percentile(self, percentile):
+        """Chart for one percentile from the shared bootstrap (runs in a sweep worker)."""
+        self.select_percentile(percentile, verbose=False)
+        self.boot_percentiles = self._percentile_bootstrap(percentile)
+        self.ci95_p = np.percentile(self.boot_percentiles, [2.5, 97.5])
+        return self.generate_and_save_visuals()
 
     # ====================== RUN EVERYTHING ======================
     def run(self):
@@ -273,16 +456,38 @@ class RatioAnalyzer:
         self.block_bootstrap_overall_mean()
         self.setup_dynamic_balanced_range()
         self.block_bootstrap_percentile()
+        self.percentile_ci_table()
         self.generate_and_save_visuals()
 
 
 # ====================== ENTRY POINT ======================
 if __name__ == "__main__":
+    # paired files and outputs sit next to the script, as when it was run from its own folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    # everything after --sweep is the list of percentiles
+    sweep = None
+    if '--sweep' in sys.argv:
+        at = sys.argv.index('--sweep')
+        sweep = [float(p) for p in sys.argv[at + 1:]] or [85, 90, 95]
+        sys.argv = sys.argv[:at]
+
     mode = 'day'
     if len(sys.argv) > 1:
         mode = sys.argv[1].lower().strip()
 
-    print(f"🚀 BTC/ETH Ratio Full Stats Analyzer - {mode.upper()} mode\n")
+    bootstrap_method = 'moving'
+    if len(sys.argv) > 2:
+        bootstrap_method = sys.argv[2].lower().strip()
+
+    block_size = 21
+    if len(sys.argv) > 3:
+        block_size = sys.argv[3] if sys.argv[3].lower() == 'auto' else int(sys.argv[3])
+
+    print(f"🚀 BTC/ETH Ratio Full Stats Analyzer - {mode.upper()} mode ({bootstrap_method} bootstrap)\n")
 
-    analyzer = RatioAnalyzer(mode=mode)
-    analyzer.run()
+    analyzer = RatioAnalyzer(mode=mode, bootstrap_method=bootstrap_method, block_size=block_size)
+    if sweep is None:
+        analyzer.run()
+    else:
+        analyzer.sweep(sweep)
@@ -3,12 +3,16 @@ import numpy as np
 from scipy import stats
 import matplotlib.pyplot as plt
 import seaborn as sns
+import os
+
+from btc_eth_stats_bootstrapping_method.resampling import block_bootstrap
 
 class RatioDailyAnalyzer:
     """Encapsulates the entire BTC/ETH daily ratio analysis (stats + bootstrap + interactive range + chart)."""
 
     def __init__(self, csv_path: str = 'btc_eth_day_paired.csv'):
         self.csv_path = csv_path
+        self.rng = np.random.default_rng(42)
         self._load_and_clean_data()
 
     def _load_and_clean_data(self):
@@ -82,8 +86,7 @@ class RatioDailyAnalyzer:
 
         print(f"Using {len(self.changes_np):,} daily observations | Block size = 21 days (~3 weeks)")
 
-        np.random.seed(42)
-        boot_means = self._moving_block_bootstrap(self.changes_np, block_size=21, n_boot=5000)
+        boot_means = self._moving_block_bootstrap(self.changes_np, block_size=21, n_boot=5000, rng=self.rng)
 
         mean_boot = boot_means.mean()
         ci95_mean = np.percentile(boot_means, [2.5, 97.5])
@@ -96,15 +99,9 @@ class RatioDailyAnalyzer:
         print(f"   Bootstrapped p-value (mean=0) : {p_boot:.4f} → {'Significant' if p_boot <= 0.05 else 'Not significant'}")
 
     @staticmethod
-    def _moving_block_bootstrap(series, block_size=21, n_boot=5000):
-        n = len(series)
-        boot_means = np.empty(n_boot)
-        n_blocks = int(np.ceil(n / block_size))
-        for i in range(n_boot):
-            starts = np.random.randint(0, n - block_size + 1, size=n_blocks)
-            sample = np.concatenate([series[s:s+block_size] for s in starts])[:n]
-            boot_means[i] = sample.mean()
-        return boot_means
+    def _moving_block_bootstrap(series, block_size=21, n_boot=5000, rng=None):
+        # all blocks of a chunk of resamples are gathered at once from a sliding-window view
+        return block_bootstrap(series, lambda sample: sample.mean(axis=1), n_boot, block_size, 'moving', rng)
 
     # ====================== 6. DYNAMIC BALANCED RANGE ======================
     def setup_dynamic_balanced_range(self):
@@ -161,7 +158,7 @@ class RatioDailyAnalyzer:
     def block_bootstrap_percentile(self):
         print(f"\n🔬 Block-bootstrap 95% CI for your chosen {self.PERCENTILE}th percentile...")
 
-        boot_p = self._bootstrap_percentile(self.abs_np, percentile=self.PERCENTILE, n_boot=3000)
+        boot_p = self._bootstrap_percentile(self.abs_np, percentile=self.PERCENTILE, n_boot=3000, rng=self.rng)
         ci95_p = np.percentile(boot_p, [2.5, 97.5])
 
         self.boot_percentiles = boot_p
@@ -171,15 +168,8 @@ class RatioDailyAnalyzer:
         print(f"   Block-bootstrap 95% CI : ±[{ci95_p[0]*100:.1f}%, {ci95_p[1]*100:.1f}%]")
 
     @staticmethod
-    def _bootstrap_percentile(data, percentile, block_size=21, n_boot=3000):
-        n = len(data)
-        n_blocks = int(np.ceil(n / block_size))
-        boot_pcts = np.empty(n_boot)
-        for i in range(n_boot):
-            starts = np.random.randint(0, n - block_size + 1, size=n_blocks)
-            sample = np.concatenate([data[s:s+block_size] for s in starts])[:n]
-            boot_pcts[i] = np.percentile(np.abs(sample), percentile)
-        return boot_pcts
+    def _bootstrap_percentile(data, percentile, block_size=21, n_boot=3000, rng=None):
+        return block_bootstrap(data, lambda sample: np.percentile(np.abs(sample), percentile, axis=1), n_boot, block_size, 'moving', rng)
 
     # ====================== 8. VISUALS + SAVE PNG ======================
     def generate_and_save_visuals(self):
@@ -253,5 +243,8 @@ class RatioDailyAnalyzer:
 
 # ====================== ENTRY POINT ======================
 if __name__ == "__main__":
+    # paired file and outputs sit next to the script, as when it was run from its own folder
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
     analyzer = RatioDailyAnalyzer()   # you can also pass a custom path: RatioDailyAnalyzer('my_data.csv')
     analyzer.run()